@@ -28,9 +28,8 @@ class App:
         print("mdirty!")
 
     def on_ldirty(self):
-        for bus in self.vm.bus:
-            if bus.levels.isdirty:
-                print(bus, bus.levels.all)
+        for i in self.vm.dirty_buses():
+            print(self.vm.bus[i], self.vm.bus[i].levels.all)
 
     def on_midi(self):
         current = self.vm.midi.current
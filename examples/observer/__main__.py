@@ -21,9 +21,8 @@ class App:
         elif event == "mdirty":
             print("mdirty!")
         elif event == "ldirty":
-            for bus in self.vm.bus:
-                if bus.levels.isdirty:
-                    print(bus, bus.levels.all)
+            for i in self.vm.dirty_buses():
+                print(self.vm.bus[i], self.vm.bus[i].levels.all)
         elif event == "midi":
             current = self.vm.midi.current
             print(f"Value of midi button {current} is {self.vm.midi.get(current)}")
@@ -0,0 +1,40 @@
+import argparse
+import timeit
+
+import voicemeeterlib
+
+LAZY = ("button", "vban", "device", "recorder", "patch", "fx")
+
+argparser = argparse.ArgumentParser(description="times Remote construction")
+argparser.add_argument(
+    "--backend",
+    default="simulator",
+    help="api() backend, simulator by default, dll for the Voicemeeter DLL",
+)
+args = argparser.parse_args()
+
+
+def lazy(kind_id):
+    vm = voicemeeterlib.api(kind_id, backend=args.backend)
+    vm.strip[0].mute
+
+
+def eager(kind_id):
+    vm = voicemeeterlib.api(kind_id, backend=args.backend)
+    vm.strip[0].mute
+    for attr in LAZY:
+        getattr(vm, attr, None)
+
+
+def main():
+    NUMBER = 200
+
+    for kind_id in ("basic", "banana", "potato"):
+        eager(kind_id)  # warm up, class generation and imports
+        for fn in (eager, lazy):
+            elapsed = timeit.timeit(lambda: fn(kind_id), number=NUMBER)
+            print(f"{kind_id:<8}{fn.__name__:<8}{elapsed / NUMBER * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
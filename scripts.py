@@ -39,6 +39,11 @@ def ex_observer():
     subprocess.run([sys.executable, str(scriptpath)])
 
 
+def ex_startup():
+    scriptpath = Path.cwd() / "examples" / "startup" / "."
+    subprocess.run([sys.executable, str(scriptpath)])
+
+
 def test_basic():
     os.environ["KIND"] = "basic"
     subprocess.run(["tox"])
@@ -35,7 +35,7 @@ class Data:
 KIND_ID = os.environ.get(
     "KIND", random.choice(tuple(kind_id.name.lower() for kind_id in KindId))
 )
-vm = voicemeeterlib.api(KIND_ID)
+vm = voicemeeterlib.api(KIND_ID, backend=os.environ.get("BACKEND", "dll"))
 kind = kindmap(KIND_ID)
 
 data = Data(
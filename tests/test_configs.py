@@ -1,6 +1,8 @@
 import pytest
 
+import voicemeeterlib
 from tests import data, vm
+from voicemeeterlib import util
 
 
 class TestUserConfigs:
@@ -42,7 +44,87 @@ class TestUserConfigs:
     def test_it_tests_vm_config_busmode(self):
         assert vm.bus[data.phys_out].mode.get() == "composite"
 
+    def test_it_tests_vm_config_applied_as_diff(self):
+        vm.strip[data.virt_in].bass = 0.0
+        vm.apply_config("example", diff=True)
+        assert vm.strip[data.virt_in].bass == -3.2
+        assert "PhysStrip" in vm.strip[data.phys_in].label
+
     def test_it_tests_vm_config_bass_med_high(self):
         assert vm.strip[data.virt_in].bass == -3.2
         assert vm.strip[data.virt_in].mid == 1.5
         assert vm.strip[data.virt_in].high == 2.1
+
+
+class TestCompiledConfigs:
+    __test__ = True
+
+    """configs compiled into scripts, cached until a config is replaced"""
+
+    @classmethod
+    def setup_class(cls):
+        vm.configs["compiled"] = cls.config(-3.0)
+
+    @classmethod
+    def teardown_class(cls):
+        del vm.configs["compiled"]
+
+    @staticmethod
+    def config(gain, label="compiled") -> dict:
+        return {f"strip-{data.phys_in}": {"label": label, "gain": gain}}
+
+    def test_it_reuses_a_compiled_config(self):
+        assert vm._compile_config("compiled") is vm._compile_config("compiled")
+
+    def test_it_merges_an_extending_config_once(self, monkeypatch):
+        merges = []
+
+        def deep_merge(*args):
+            merges.append(args)
+            yield from util.deep_merge(*args)
+
+        monkeypatch.setattr("voicemeeterlib.remote.deep_merge", deep_merge)
+        vm.configs["extending"] = {"extends": "compiled"}
+        try:
+            for _ in range(5):
+                vm._compile_config("extending")
+        finally:
+            del vm.configs["extending"]
+        assert len(merges) == 1
+
+    def test_it_recompiles_a_replaced_config(self):
+        compiled = vm._compile_config("compiled")
+        vm.configs["compiled"] = self.config(-6.0)
+        recompiled = vm._compile_config("compiled")
+        assert recompiled is not compiled
+        assert (f"strip[{data.phys_in}].gain", -6.0) in recompiled[1]
+
+    def test_it_recompiles_a_config_when_the_config_it_extends_is_replaced(self):
+        vm.configs["extending"] = {"extends": "compiled"}
+        try:
+            compiled = vm._compile_config("extending")
+            vm.configs["compiled"] = self.config(-6.0, label="replaced")
+            recompiled = vm._compile_config("extending")
+            assert recompiled is not compiled
+            assert (f"strip[{data.phys_in}].Label", "replaced") in recompiled[1]
+        finally:
+            del vm.configs["extending"]
+
+    def test_it_writes_write_only_params_without_reading_them(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        sim.configs["devices"] = {
+            f"strip-{data.phys_in}": {"device": {"wdm": "Speakers"}, "gain": -3.0}
+        }
+        with sim.trace() as tracer:
+            sim.apply_config("devices", diff=True)
+        reads = [
+            entry["args"][0]
+            for entry in tracer.entries
+            if entry["fn"].startswith("VBVMR_GetParameter")
+        ]
+        assert reads == [f"strip[{data.phys_in}].gain"]
+        assert f'Strip[{data.phys_in}].device.wdm="Speakers";' in "".join(
+            entry["args"][0]
+            for entry in tracer.entries
+            if entry["fn"] == "VBVMR_SetParameters"
+        )
@@ -16,6 +16,27 @@ class TestErrors:
         ):
             voicemeeterlib.api("unknown_kind")
 
+    def test_it_tests_an_unknown_event_rate(self):
+        with pytest.raises(
+            voicemeeterlib.error.VMError,
+            match="Unknown event type\\(s\\) in rates: unknown_event",
+        ):
+            voicemeeterlib.api(data.name, rates={"unknown_event": 0.1})
+
+    def test_it_tests_an_unknown_backend(self):
+        with pytest.raises(
+            voicemeeterlib.error.VMError,
+            match="Unknown backend 'unknown_backend'",
+        ):
+            voicemeeterlib.api(data.name, backend="unknown_backend")
+
+    def test_it_tests_a_wrong_number_of_level_thresholds(self):
+        with pytest.raises(
+            voicemeeterlib.error.VMError,
+            match="Expected 16 level thresholds for mode 3, got 1",
+        ):
+            voicemeeterlib.api("basic", backend="simulator", level_threshold={3: [1.0]})
+
     def test_it_tests_an_unknown_parameter(self):
         with pytest.raises(
             voicemeeterlib.error.CAPIError,
@@ -1,5 +1,6 @@
 import pytest
 
+import voicemeeterlib
 from tests import data, vm
 
 
@@ -64,3 +65,136 @@ class TestRemoteFactories:
         assert len(vm.bus) == 8
         assert len(vm.button) == 80
         assert len(vm.vban.instream) == 10 and len(vm.vban.outstream) == 9
+
+    def test_it_tests_lazy_attrs_are_built_once(self):
+        assert vm.button is vm.button
+        assert vm.vban is vm.vban
+        assert vm.device is vm.device
+
+    def test_it_tests_indexed_views(self):
+        assert len(vm.button) == 80
+        assert vm.button[-1].index == vm.button[79].index == 79
+        assert [button.index for button in vm.button[:3]] == [0, 1, 2]
+        with pytest.raises(IndexError):
+            vm.button[80]
+
+    def test_it_tests_indexed_views_behave_like_tuples(self):
+        buttons = tuple(vm.button)
+        assert vm.button == buttons and hash(vm.button) == hash(buttons)
+        assert vm.button[::-1] == buttons[::-1]
+        assert vm.button[-3:] == buttons[-3:]
+        assert vm.button + (None,) == buttons + (None,)
+        assert (None,) + vm.button == (None,) + buttons
+        assert vm.button * 2 == buttons * 2
+        assert vm.button.index(vm.button[5]) == 5 and vm.button[5] in vm.button
+
+
+class TestSchema:
+    __test__ = True
+
+    def test_it_tests_strip_and_bus_classes_are_shared(self):
+        assert isinstance(vm.strip[data.phys_in], type(vm.strip[0]))
+        assert isinstance(vm.strip[data.virt_in], type(vm.strip[data.phys_in + 1]))
+        assert isinstance(vm.bus[data.phys_out], type(vm.bus[0]))
+
+    @pytest.mark.parametrize(
+        "section, index",
+        [
+            ("PhysicalStrip", data.phys_in),
+            ("VirtualStrip", data.virt_in),
+            ("PhysicalBus", data.phys_out),
+            ("VirtualBus", data.virt_out),
+        ],
+    )
+    def test_it_tests_schema_params_are_attributes(self, section, index):
+        target = vm.strip[index] if "Strip" in section else vm.bus[index]
+        for param in vm.schema[section]:
+            assert hasattr(type(target), param.name)
+
+    @pytest.mark.parametrize(
+        "target, param, expected",
+        [
+            ("strip", "gain", f"strip[{data.phys_in}].gain"),
+            ("comp", "", f"Strip[{data.phys_in}].comp"),
+            ("comp", "Ratio", f"Strip[{data.phys_in}].comp.Ratio"),
+        ],
+    )
+    def test_it_tests_param_names_are_built_once(self, target, param, expected):
+        strip = vm.strip[data.phys_in]
+        target = strip if target == "strip" else strip.comp
+        assert target._cmd(param) == expected
+        assert target._cmd(param) is target._cmd(param)
+
+    def test_it_tests_schema_params_match_properties(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        phys_in, phys_out = sim.kind.phys_in, sim.kind.phys_out
+        targets = {
+            "PhysicalStrip": sim.strip[0],
+            "VirtualStrip": sim.strip[phys_in],
+            "StripComp": sim.strip[0].comp,
+            "StripGate": sim.strip[0].gate,
+            "StripDenoiser": sim.strip[0].denoiser,
+            "StripEQ": sim.strip[0].eq,
+            "StripDevice": sim.strip[0].device,
+            "PhysicalBus": sim.bus[0],
+            "VirtualBus": sim.bus[phys_out],
+            "BusEQ": sim.bus[0].eq,
+            "BusMode": sim.bus[0].mode,
+            "BusDevice": sim.bus[0].device,
+        }
+        for name, section in sim.schema.items():
+            for i, param in enumerate(section):
+                if name == "GainLayer":
+                    target = sim.strip[0].gainlayer[i]
+                else:
+                    target = targets[name]
+                identifier = section.identifier.format(index=target.index)
+                expected = f"{identifier}.{param.param}" if param.param else identifier
+                prop = getattr(type(target), param.name)
+                assert isinstance(prop, property)
+                assert (prop.fget is not None) == ("r" in param.access)
+                assert (prop.fset is not None) == ("w" in param.access)
+                with sim.trace() as tracer:
+                    if prop.fget:
+                        getattr(target, param.name)
+                    if prop.fset:
+                        val = {str: "x", bool: True}.get(param.type, 0)
+                        setattr(
+                            target, param.name, param.range[0] if param.range else val
+                        )
+                # bus mode getters clear dirty parameters first
+                assert {
+                    entry["args"][0] for entry in tracer.entries if entry["args"]
+                } == {expected}
+
+    @pytest.mark.parametrize(
+        "target, name, value",
+        [("strip", "gain", 13), ("comp", "ratio", 0.5), ("bus", "gain", -61)],
+    )
+    def test_it_tests_schema_ranges_are_checked(self, caplog, target, name, value):
+        target = {
+            "strip": vm.strip[data.phys_in],
+            "comp": vm.strip[data.phys_in].comp,
+            "bus": vm.bus[data.phys_out],
+        }[target]
+        setattr(target, name, value)
+        assert f"{name} got: {value} but expected a value from" in caplog.text
+
+    def test_it_tests_schema_ranges_leave_other_types_to_the_setter(self, caplog):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        with sim.trace() as tracer:
+            sim.strip[data.phys_in].gain = "loud"
+        assert tracer.counts() == {"VBVMR_SetParameterStringW": 1}
+        assert "expected a value from" not in caplog.text
+
+    def test_it_tests_indexed_views_reuse_objects(self):
+        views = (
+            [vm.button, vm.strip[0].gainlayer] if data.name == "potato" else [vm.button]
+        )
+        if data.name != "basic":
+            views += [vm.recorder.armstrip, vm.patch.composite, vm.option.delay]
+        for view in views:
+            assert view[0] is view[0]
+            assert view[-1] is view[len(view) - 1]
+        cmd = vm.button[0]._cmd("state")
+        assert vm.button[0]._cmds["state"] is cmd
@@ -1,6 +1,13 @@
+import asyncio
+import threading
+
 import pytest
 
+import voicemeeterlib
 from tests import data, vm
+from voicemeeterlib.aio import EventForwarder
+from voicemeeterlib.bus import BusModes
+from voicemeeterlib.mirror import StateMirror
 
 
 @pytest.mark.parametrize("value", [False, True])
@@ -631,3 +638,176 @@ class TestSetAndGetMacroButtonHigher:
     def test_it_sets_and_gets_macrobutton_params(self, index, param, value):
         setattr(vm.button[index], param, value)
         assert getattr(vm.button[index], param) == value
+
+
+class TestBatchHigher:
+    __test__ = True
+
+    """batched setters, flushed as a script"""
+
+    @pytest.mark.parametrize(
+        "index, values",
+        [(data.phys_in, (-3.6, -6.0)), (data.virt_in, (2.1, 5.8))],
+    )
+    def test_it_sets_strip_gain_in_a_batch_last_write_wins(self, index, values):
+        with vm.batch():
+            for value in values:
+                vm.strip[index].gain = value
+            assert vm.batching
+        assert not vm.batching
+        assert vm.strip[index].gain == values[-1]
+
+    @pytest.mark.parametrize("value", [False, True])
+    def test_it_sets_bus_mute_in_a_batch(self, value):
+        with vm.batch():
+            vm.bus[data.phys_out].mute = value
+            vm.bus[data.virt_out].mute = value
+        assert vm.bus[data.phys_out].mute == value
+        assert vm.bus[data.virt_out].mute == value
+
+
+class TestBusModesHigher:
+    __test__ = True
+
+    """bus modes read in one pass"""
+
+    @pytest.mark.parametrize(
+        "index, mode",
+        [(data.phys_out, "amix"), (data.virt_out, "composite")],
+    )
+    def test_it_sets_and_gets_bus_mode(self, index, mode):
+        setattr(vm.bus[index].mode, mode, True)
+        with vm.trace() as tracer:
+            assert vm.bus[index].mode.get() == mode
+        assert tracer.counts()["VBVMR_GetParameterFloat"] <= len(BusModes) - 1
+
+    def test_it_gets_all_bus_modes(self):
+        vm.bus[data.phys_out].mode.amix = True
+        vm.bus[data.virt_out].mode.normal = True
+        modes = vm.bus_modes()
+        assert len(modes) == len(vm.bus)
+        assert modes[data.phys_out] == BusModes.amix
+        assert modes[data.virt_out] == BusModes.normal
+
+
+class TestMirrorHigher:
+    __test__ = True
+
+    """reads served by the state mirror"""
+
+    @classmethod
+    def setup_class(cls):
+        vm.enable_mirror()
+
+    @classmethod
+    def teardown_class(cls):
+        vm.disable_mirror()
+
+    @pytest.mark.parametrize(
+        "index, value",
+        [(data.phys_in, -3.6), (data.virt_in, 5.8)],
+    )
+    def test_it_sets_and_gets_strip_gain_mirrored(self, index, value):
+        vm.strip[index].gain = value
+        assert vm.mirror.values[f"strip[{index}].gain"] == value
+        # the write cache would answer the first read, the write marked parameters dirty
+        vm.cache.clear()
+        vm.clear_dirty()
+        with vm.trace() as tracer:
+            assert vm.strip[index].gain == value
+            assert vm.strip[index].gain == value
+        reads = tracer.counts()["VBVMR_GetParameterFloat"]
+        assert reads == sum(not s for s in vm.mirror.params.values())
+
+    def test_it_refreshes_when_clear_dirty_consumes_a_change(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        mirror = sim.enable_mirror()
+        # a change made in the GUI, behind the mirror's back
+        sim.backend._write(f"strip[{data.phys_in}].gain", -7.5)
+        sim.clear_dirty()
+        assert mirror.stale
+        assert sim.strip[data.phys_in].gain == -7.5
+        assert not mirror.stale
+
+    @pytest.mark.parametrize("value", ["mirrored", "label"])
+    def test_it_sets_and_gets_bus_label_mirrored(self, value):
+        vm.bus[data.phys_out].label = value
+        assert vm.bus[data.phys_out].label == value
+
+    def test_it_drops_parameters_that_fail_to_read(self):
+        mirror = StateMirror(vm, {"strip[0].gain": False, "unknown[0].gain": False})
+        mirror.refresh()
+        assert list(mirror.params) == ["strip[0].gain"]
+        assert "unknown[0].gain" not in mirror.values
+        mirror.refresh()
+
+
+class TestAsyncHigher:
+    __test__ = True
+
+    """asyncio front end, backed by the simulator"""
+
+    @staticmethod
+    def run(main, **kwargs):
+        async def wrapper():
+            async with voicemeeterlib.api_async(
+                data.name, backend="simulator", **kwargs
+            ) as avm:
+                return await main(avm)
+
+        return asyncio.run(wrapper())
+
+    def test_it_sets_and_gets_a_param(self):
+        async def main(avm):
+            await avm.set(f"Strip[{data.phys_in}].Gain", -3.5)
+            return await avm.get(f"Strip[{data.phys_in}].Gain")
+
+        assert self.run(main) == -3.5
+
+    def test_it_yields_events_until_closed(self):
+        async def main(avm):
+            events = avm.events()
+            event = asyncio.create_task(anext(events))
+            await asyncio.sleep(0)  # the generator subscribes on its first step
+            await avm.set(f"Strip[{data.phys_in}].Mute", 1)
+            assert await asyncio.wait_for(event, 1) == "pdirty"
+            await events.aclose()
+            return avm.observer.observers
+
+        observers = self.run(main, pdirty=True, ratelimit=0.01)
+        assert not any(isinstance(o, EventForwarder) for o in observers)
+
+    def test_it_deregisters_a_forwarder_when_its_loop_is_closed(self):
+        vm = voicemeeterlib.api(data.name, backend="simulator")
+        loop = asyncio.new_event_loop()
+        forwarder = EventForwarder(loop, vm.subject)
+        vm.subject.add(forwarder)
+        loop.close()
+        vm.subject.notify("pdirty")
+        assert forwarder not in vm.subject.observers
+
+    def test_it_applies_a_config(self):
+        async def main(avm):
+            await avm.apply_config("example")
+            return avm.strip[data.virt_in].bass, avm.bus[data.phys_out].label
+
+        bass, label = self.run(main)
+        assert bass == -3.2
+        assert "PhysBus" in label
+
+    def test_it_compiles_a_config_off_the_event_loop(self, monkeypatch):
+        threads = []
+
+        async def main(avm):
+            compile_config = avm._remote._compile_config
+
+            def record(name):
+                threads.append(threading.current_thread())
+                return compile_config(name)
+
+            monkeypatch.setattr(avm._remote, "_compile_config", record)
+            await avm.apply_config("example")
+            return threading.current_thread()
+
+        loop_thread = self.run(main)
+        assert threads and threads[0] is not loop_thread
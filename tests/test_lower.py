@@ -1,6 +1,23 @@
+import math
+import os
+import socket
+import struct
+import threading
+import time
+import tracemalloc
+
 import pytest
 
+import voicemeeterlib
 from tests import data, vm
+from voicemeeterlib import levels
+from voicemeeterlib.error import VMError
+from voicemeeterlib.levelserver import LevelClient, LevelServer
+from voicemeeterlib.levelshm import LevelPublisher, LevelReader
+from voicemeeterlib.simulator import Simulator
+from voicemeeterlib.trace import Replayer
+from voicemeeterlib.updater import Updater
+from voicemeeterlib.util import script_chunks
 
 
 class TestSetAndGetFloatLower:
@@ -78,3 +95,525 @@ class TestMacroButtonsLower:
     def test_it_sets_and_gets_macrobuttons_trigger(self, index, mode, value):
         vm.set_buttonstatus(index, value, mode)
         assert vm.get_buttonstatus(index, mode) == value
+
+
+class TestLevelsLower:
+    __test__ = True
+
+    """VBVMR_GetLevel"""
+
+    def test_it_gets_levels_snapshot_and_compares_length_of_arrays(self):
+        strip_levels, bus_levels = vm.levels_snapshot()
+        assert len(strip_levels) == vm.kind.num_strip_levels
+        assert len(bus_levels) == vm.kind.num_bus_levels
+
+    def test_it_reuses_levels_snapshot_buffers(self):
+        strip_levels, bus_levels = vm.levels_snapshot()
+        for _ in range(10):
+            strip_view, bus_view = vm.levels_snapshot()
+            assert strip_view is strip_levels and bus_view is bus_levels
+
+    @pytest.mark.skipif(levels.np is None, reason="Skip test if NumPy is not installed")
+    def test_it_converts_levels_the_same_with_and_without_numpy(self):
+        edges = [0.0, -0.0, 1e-45, 1e-38, 1e-10, 0.5, 0.999999, 1.0, 1.000001, 2.0]
+        edges += [math.inf, math.nan, -0.5]
+        # float32 values, as read from the DLL
+        frame = edges + [
+            struct.unpack("f", struct.pack("f", i / 997))[0] for i in range(2000)
+        ]
+        assert levels._convert_numpy(frame) == levels._convert_python(frame)
+
+    def test_it_gives_each_thread_its_own_levels_snapshot_buffers(self):
+        views = []
+        thread = threading.Thread(target=lambda: views.extend(vm.levels_snapshot()))
+        thread.start()
+        thread.join()
+        assert not any(a is b for a, b in zip(vm.levels_snapshot(), views))
+
+    def test_it_takes_levels_snapshots_without_allocating(self):
+        vm.levels_snapshot()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(100):
+                vm.levels_snapshot()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # less than a byte retained per snapshot, no buffer allocated along the way
+        assert after - before < 100
+        assert peak - before < 1024
+
+
+class TestTraceLower:
+    __test__ = True
+
+    """call-count budgets, replay"""
+
+    def test_it_sets_a_float_param_in_one_call(self):
+        with vm.trace() as tracer:
+            vm.strip[data.phys_in].gain = -3.5
+        assert tracer.counts() == {"VBVMR_SetParameterFloat": 1}
+
+    def test_it_applies_a_batch_in_one_call(self):
+        with vm.trace() as tracer:
+            with vm.batch():
+                for i in range(data.virt_in + 1):
+                    vm.strip[i].mute = True
+        assert tracer.counts() == {"VBVMR_SetParameters": 1}
+
+    def test_it_sends_a_batch_in_order_of_last_write(self):
+        with vm.trace() as tracer:
+            with vm.batch():
+                vm.set(f"Strip[{data.phys_in}].Gain", -6.0)
+                vm.set(f"Strip[{data.virt_in}].Mute", 1)
+                vm.set(f"Strip[{data.phys_in}].Gain", -3.5)
+                vm.set(f"Strip[{data.phys_in}].Label", "batched")
+        assert [entry["args"] for entry in tracer.entries] == [
+            [
+                f"Strip[{data.virt_in}].Mute=1;"
+                f"Strip[{data.phys_in}].Gain=-3.5;"
+                f'Strip[{data.phys_in}].Label="batched";'
+            ]
+        ]
+
+    def test_it_rejects_a_double_quote_in_a_batch(self):
+        with vm.trace() as tracer:
+            with pytest.raises(VMError):
+                with vm.batch():
+                    vm.set(f"Strip[{data.phys_in}].Label", 'a "quoted" label')
+        assert not tracer.entries
+
+    def test_it_splits_scripts_at_the_script_limit(self):
+        param = f"Strip[{data.phys_in}].Label"
+        # a statement is the param, '=""' and ';' around the value
+        filler = "x" * (48000 - len(param) - 4)
+        assert list(script_chunks([(param, filler)])) == [f'{param}="{filler}";']
+        chunks = list(script_chunks([(param, filler), ("Strip[0].Mute", 1)]))
+        assert chunks == [f'{param}="{filler}";', "Strip[0].Mute=1;"]
+        chunks = list(script_chunks([(param, filler[:-16]), ("Strip[0].Mute", 1)]))
+        assert chunks == [f'{param}="{filler[:-16]}";Strip[0].Mute=1;']
+
+    def test_it_quotes_script_strings_by_parameter(self):
+        label, fade = f"Strip[{data.phys_in}].Label", f"Strip[{data.phys_in}].FadeTo"
+        chunks = list(script_chunks([(label, "(live)"), (fade, "(-6.0, 500)")]))
+        assert chunks == [f'{label}="(live)";{fade}=(-6.0, 500);']
+
+    def test_it_batches_a_parenthesized_label_and_a_bool(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        with sim.batch():
+            sim.set(f"Strip[{data.phys_in}].Label", "(live)")
+            sim.set(f"Strip[{data.phys_in}].Mute", True)
+        sim.cache.clear()
+        assert sim.get(f"Strip[{data.phys_in}].Label", True) == "(live)"
+        assert sim.get(f"Strip[{data.phys_in}].Mute") == 1
+
+    def test_it_sends_an_argument_list_in_a_script(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        with sim.batch():
+            sim.strip[data.phys_in].fadeto(-6.0, 500)
+            sim.strip[data.phys_in].mute = True
+        fade = f"strip[{data.phys_in}].fadeto"
+        assert sim.backend.params[fade] == "(-6.0, 500)"
+        assert sim.backend.params[f"strip[{data.phys_in}].mute"] == 1
+
+    def test_it_writes_bools_as_ints_in_scripts(self):
+        mute = f"Strip[{data.phys_in}].Mute"
+        chunks = list(script_chunks([(mute, True), ("Strip[0].Solo", False)]))
+        assert chunks == [f"{mute}=1;Strip[0].Solo=0;"]
+
+    def test_it_keeps_a_wrapper_installed_inside_a_trace(self):
+        sim = voicemeeterlib.api(data.name, backend="simulator")
+        with sim.trace() as tracer:
+            metrics = sim.enable_metrics()
+        assert sim.call == metrics.call
+        sim.set(f"Strip[{data.phys_in}].Mute", 1)
+        assert sim.metrics()["VBVMR_SetParameterFloat"]["count"] == 1
+        assert tracer.closed and not tracer.entries
+
+    def test_it_replays_a_trace(self):
+        param = f"Strip[{data.virt_in}].Gain"
+        vm.set(param, -12.5)
+        with vm.trace() as tracer:
+            value = vm._get(param)
+        replayer = Replayer(tracer.entries)
+        vm_replay = voicemeeterlib.api(data.name, backend=replayer)
+        assert vm_replay._get(param) == value
+        assert not replayer.remaining() and not replayer.mismatches
+
+
+class TestMetricsLower:
+    __test__ = True
+
+    """call counts, latency histograms, error codes"""
+
+    @classmethod
+    def teardown_class(cls):
+        vm.disable_metrics()
+
+    def test_it_counts_calls_and_error_codes(self):
+        vm.enable_metrics().reset()
+        vm.set(f"Strip[{data.phys_in}].Mute", 1)
+        with pytest.raises(voicemeeterlib.error.CAPIError):
+            vm.set("unknown.parameter", 1)
+        metrics = vm.metrics()["VBVMR_SetParameterFloat"]
+        assert metrics["count"] == 2
+        assert metrics["histogram"][float("inf")] == 2
+        assert metrics["errors"] == {-3: 1}
+
+    def test_it_stops_counting_when_disabled(self):
+        vm.enable_metrics()
+        vm.disable_metrics()
+        assert vm.call.__func__ is type(vm).call
+        with pytest.raises(VMError):
+            vm.metrics()
+
+
+class TestLevelHistoryLower:
+    __test__ = True
+
+    """level history, synthetic levels from the simulator's VBVMR_GetLevel"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.amp = 0.5
+        sim = Simulator(data.name, signal=lambda type_, index, t: cls.amp)
+        cls.vm = voicemeeterlib.api(
+            data.name, backend=sim, ldirty=True, history=4, peak_hold=2
+        )
+        updater = Updater(cls.vm, threading.Event())
+        for cls.amp in (0.5, 1.0, 0.25, 0.25, 0.25):
+            updater._check("ldirty")
+
+    def test_it_gets_peak_hold(self):
+        assert self.vm.strip[data.phys_in].levels.peak_hold() == (-12.0, -12.0)
+
+    def test_it_gets_rms_and_average(self):
+        assert self.vm.strip[data.phys_in].levels.rms() == (-5.3, -5.3)
+        assert self.vm.strip[data.phys_in].levels.average() == (-7.2, -7.2)
+
+    def test_it_gets_clips(self):
+        assert self.vm.strip[data.phys_in].levels.clips() == (1, 1)
+        assert self.vm.bus[data.phys_out].levels.clips() == (1,) * 8
+
+    def test_it_keeps_history_bounded(self):
+        for ring in self.vm.history.rings.values():
+            assert ring.window == 4 and len(ring.frames) == 4
+
+
+class TestLevelDirtyLower:
+    __test__ = True
+
+    """level dirty bitmasks, synthetic levels from the simulator's VBVMR_GetLevel"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.amps = {}
+        sim = Simulator(
+            data.name, signal=lambda type_, i, t: cls.amps.get((type_, i), 0)
+        )
+        cls.vm = voicemeeterlib.api(data.name, backend=sim, ldirty=True)
+        cls.vm.stop_event = threading.Event()
+        cls.updater = Updater(cls.vm, cls.vm.stop_event)
+
+    def test_it_gets_dirty_strips_and_buses(self):
+        kind = self.vm.kind
+        # last channel of the first virtual strip, first channel of the last bus
+        self.amps[(0, kind.phys_in * 2 + 7)] = 0.5
+        self.amps[(3, (kind.num_bus - 1) * 8)] = 0.5
+        self.updater._check("ldirty")
+        assert self.vm.dirty_strips() == (kind.phys_in,)
+        assert self.vm.dirty_buses() == (kind.num_bus - 1,)
+        assert self.vm.strip[kind.phys_in].levels.isdirty
+        assert not self.vm.strip[0].levels.isdirty
+        assert self.vm.bus[-1].levels.isdirty
+        assert not self.vm.bus[0].levels.isdirty
+
+    def test_it_clears_dirty_when_levels_are_unchanged(self):
+        self.updater._check("ldirty")
+        self.updater._check("ldirty")
+        assert self.vm.dirty_strips() == () and self.vm.dirty_buses() == ()
+
+    def test_it_polls_a_level_mode_read_until_unsubscribed(self):
+        assert 1 not in self.vm.level_modes
+        self.vm.strip[0].levels.postfader
+        self.updater._check("ldirty")
+        assert 1 in self.vm.level_modes and 1 in self.vm.cache["levels_db"]
+        self.vm.unsubscribe_level(1)
+        assert 1 not in self.vm.level_modes and 1 not in self.vm.cache["levels_db"]
+
+
+class TestLevelThresholdLower:
+    __test__ = True
+
+    """level thresholds and notification interval, synthetic levels from the simulator"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.amps = {}
+        cls.now = 0.0
+        sim = Simulator(
+            data.name, signal=lambda type_, i, t: cls.amps.get((type_, i), 0)
+        )
+        cls.vm = voicemeeterlib.api(
+            data.name,
+            backend=sim,
+            ldirty=True,
+            level_threshold={0: 3.0, 3: 3.0},
+            level_interval=1.0,
+        )
+        cls.vm.stop_event = threading.Event()
+        cls.updater = Updater(cls.vm, cls.vm.stop_event, clock=lambda: cls.now)
+
+    def check(self, now, amp):
+        type(self).now = now
+        self.amps[(3, 0)] = amp
+        self.updater._check("ldirty")
+        return self.vm.dirty_buses()
+
+    def test_it_notifies_changes_over_threshold_at_most_once_per_interval(self):
+        assert self.check(0.0, 0.5) == (0,)
+        # -6.0 dB to -7.0 dB, under threshold
+        assert self.check(0.5, 0.447) == ()
+        # -6.0 dB to -12.0 dB, within the interval of the last notification
+        assert self.check(0.7, 0.25) == ()
+        # accumulated change is notified once the interval has passed
+        assert self.check(1.5, 0.25) == (0,)
+        assert self.check(3.0, 0.25) == ()
+
+    def test_it_ignores_unchanged_channels_with_a_zero_threshold(self):
+        kind = self.vm.kind
+        amps = {}
+        sim = Simulator(data.name, signal=lambda type_, i, t: amps.get((type_, i), 0))
+        vm = voicemeeterlib.api(
+            data.name,
+            backend=sim,
+            ldirty=True,
+            level_threshold={3: [3.0] * 8 + [0.0] * (kind.num_bus_levels - 8)},
+        )
+        vm.stop_event = threading.Event()
+        updater = Updater(vm, vm.stop_event)
+        for amp in (0.5, 0.49, 0.48):
+            # bus 0 changes under its threshold, bus 1 is silent
+            amps[(3, 0)] = amp
+            updater._check("ldirty")
+        assert vm.dirty_buses() == ()
+        amps[(3, 8)] = 0.001
+        updater._check("ldirty")
+        assert vm.dirty_buses() == (1,)
+
+
+class FakeClock:
+    """Stands in for time.monotonic and the stop event, waiting advances the clock"""
+
+    def __init__(self, until, stalls=None):
+        self.now = 0.0
+        self.until = until
+        self.stalls = stalls or {}
+        self.waits = 0
+
+    def __call__(self):
+        return self.now
+
+    def is_set(self):
+        return self.now >= self.until
+
+    def wait(self, timeout):
+        self.now += timeout + self.stalls.get(self.waits, 0)
+        self.waits += 1
+
+
+class TestUpdaterScheduleLower:
+    __test__ = True
+
+    """event deadlines, the updater runs against a fake clock"""
+
+    def run(self, clock):
+        vm = voicemeeterlib.api(
+            data.name,
+            backend="simulator",
+            pdirty=True,
+            mdirty=True,
+            rates={"pdirty": 0.125, "mdirty": 0.25},
+        )
+        updater = Updater(vm, clock, clock=clock)
+        checks = []
+        updater._check = lambda event: checks.append((event, clock.now))
+        updater.run()
+        return updater, checks
+
+    def test_it_checks_each_event_type_on_its_deadline(self):
+        _, checks = self.run(FakeClock(until=0.5))
+        assert checks == [
+            ("pdirty", 0.0),
+            ("mdirty", 0.0),
+            ("pdirty", 0.125),
+            ("pdirty", 0.25),
+            ("mdirty", 0.25),
+            ("pdirty", 0.375),
+        ]
+
+    def test_it_coalesces_missed_checks_and_reports_drift(self):
+        # the first wait overruns by 300ms, two pdirty deadlines and one mdirty deadline are missed
+        updater, checks = self.run(FakeClock(until=0.5, stalls={0: 0.3}))
+        assert checks == [
+            ("pdirty", 0.0),
+            ("mdirty", 0.0),
+            ("pdirty", 0.425),
+            ("mdirty", 0.425),
+        ]
+        assert updater.drift == {
+            "pdirty": pytest.approx(0.3),
+            "mdirty": pytest.approx(0.175),
+        }
+
+    def test_it_polls_each_event_type_at_its_rate(self):
+        vm = voicemeeterlib.api(
+            data.name,
+            backend="simulator",
+            pdirty=True,
+            mdirty=True,
+            midi=True,
+            rates={"pdirty": 0.125, "mdirty": 0.25, "midi": 0.5},
+        )
+        clock = FakeClock(until=1.0)
+        updater = Updater(vm, clock, clock=clock)
+        with vm.trace() as tracer:
+            updater.run()
+        assert tracer.counts() == {
+            "VBVMR_IsParametersDirty": 8,
+            "VBVMR_MacroButton_IsDirty": 4,
+            "VBVMR_GetMidiMessage": 2,
+        }
+
+
+class TestLevelServerLower:
+    __test__ = True
+
+    """level frames published to clients on localhost, synthetic levels from the simulator"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.amps = {}
+        sim = Simulator(
+            data.name, signal=lambda type_, i, t: cls.amps.get((type_, i), 0)
+        )
+        cls.vm = voicemeeterlib.api(data.name, backend=sim, ldirty=True)
+        cls.vm.stop_event = threading.Event()
+        cls.updater = Updater(cls.vm, cls.vm.stop_event)
+
+    @pytest.mark.parametrize(
+        "transport",
+        [
+            "tcp",
+            pytest.param(
+                "unix",
+                marks=pytest.mark.skipif(
+                    not hasattr(socket, "AF_UNIX"), reason="no UNIX sockets"
+                ),
+            ),
+        ],
+    )
+    def test_it_publishes_level_frames(self, transport, tmp_path):
+        address = ("127.0.0.1", 0) if transport == "tcp" else str(tmp_path / "levels")
+        with LevelServer(self.vm, address, transport) as server:
+            with LevelClient(server.address, transport, timeout=2) as client:
+                self.amps[(0, 0)] = self.amps.get((0, 0), 0) + 0.1
+                self.amps[(3, 8)] = 0.25 if self.amps.get((3, 8)) == 0.5 else 0.5
+                self.updater._check("ldirty")
+                frame = client.recv()
+                assert frame.seq == server.seq
+                assert frame.levels.keys() == set(self.vm.level_modes)
+                assert client.strip[0].prefader[0] == round(
+                    20 * math.log10(self.amps[(0, 0)]), 1
+                )
+                assert client.strip[0].isdirty and not client.strip[1].isdirty
+                assert client.bus[1].all[:2] == (
+                    round(20 * math.log10(self.amps[(3, 8)]), 1),
+                    -200.0,
+                )
+                assert client.bus[1].isdirty and not client.bus[0].isdirty
+
+    def test_it_rejects_the_unix_transport_without_af_unix(self, monkeypatch):
+        monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+        with pytest.raises(voicemeeterlib.error.VMError):
+            LevelServer(self.vm, "levels.sock", "unix")
+        with pytest.raises(voicemeeterlib.error.VMError):
+            LevelClient("levels.sock", "unix")
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no UNIX sockets")
+    def test_it_removes_the_unix_socket_on_close(self, tmp_path):
+        path = str(tmp_path / "levels")
+        for _ in range(2):
+            with LevelServer(self.vm, path, "unix"):
+                assert os.path.exists(path)
+        assert not os.path.exists(path)
+
+    def test_it_skips_frames_for_a_client_that_does_not_read(self):
+        with LevelServer(self.vm, ("127.0.0.1", 0)) as server:
+            with LevelClient(server.address, timeout=2) as client:
+                while not server.clients:
+                    time.sleep(0.01)
+                (stream,) = server.clients
+                # hold the sender, frames published meanwhile replace the unsent one
+                with stream._cond:
+                    for i in range(5):
+                        self.amps[(3, 0)] = 0.1 * (i + 1)
+                        self.updater._check("ldirty")
+                assert stream.skipped == 4
+                assert client.recv().seq == server.seq
+
+
+class TestLevelShmLower:
+    __test__ = True
+
+    """level frames in shared memory, synthetic levels from the simulator"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.amps = {}
+        sim = Simulator(
+            data.name, signal=lambda type_, i, t: cls.amps.get((type_, i), 0)
+        )
+        cls.vm = voicemeeterlib.api(data.name, backend=sim, ldirty=True)
+        cls.vm.stop_event = threading.Event()
+        cls.updater = Updater(cls.vm, cls.vm.stop_event)
+
+    def test_it_reads_published_level_frames(self):
+        with LevelPublisher(self.vm) as publisher:
+            with LevelReader(publisher.name) as reader:
+                assert reader.seq == 0
+                self.amps[(3, 8)] = 0.25 if self.amps.get((3, 8)) == 0.5 else 0.5
+                self.updater._check("ldirty")
+                assert reader.seq == publisher.seq == 2
+                frame = reader.read()
+                assert frame.levels.keys() == set(self.vm.level_modes)
+                assert frame.levels[3] == self.vm.cache["levels"][3]
+                assert reader.bus[1].all == self.vm.cache["levels_db"][3][8:16]
+                assert reader.bus[1].isdirty and not reader.bus[0].isdirty
+
+    def test_it_retries_while_a_frame_is_written(self):
+        with LevelPublisher(self.vm) as publisher:
+            with LevelReader(publisher.name) as reader:
+                struct.pack_into("=Q", publisher._shm.buf, 8, 1)
+                with pytest.raises(voicemeeterlib.error.VMError):
+                    reader.read(retries=3)
+
+    def test_it_reads_validated_views_in_place(self):
+        with LevelPublisher(self.vm) as publisher:
+            with LevelReader(publisher.name) as reader:
+                self.amps[(3, 8)] = 0.25 if self.amps.get((3, 8)) == 0.5 else 0.5
+                self.updater._check("ldirty")
+                seq = reader.begin()
+                assert tuple(reader.views[3]) == self.vm.cache["levels"][3]
+                assert reader.validate(seq)
+                self.amps[(3, 8)] = 0.25 if self.amps.get((3, 8)) == 0.5 else 0.5
+                self.updater._check("ldirty")
+                assert not reader.validate(seq)
+
+    def test_it_stops_publishing_on_close(self):
+        publisher = LevelPublisher(self.vm)
+        publisher.close()
+        assert publisher not in self.vm.observer.observers
+        publisher.publish()
+        publisher.close()
@@ -1,3 +1,18 @@
-from .factory import request_remote_obj as api
+__ALL__ = ["api", "api_async"]
 
-__ALL__ = ["api"]
+
+def __getattr__(name):
+    """
+    Entry points are imported on first use.
+
+    Importing the package does not load the DLL.
+    """
+    match name:
+        case "api":
+            from .factory import request_remote_obj as entry
+        case "api_async":
+            from .aio import request_async_remote_obj as entry
+        case _:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = entry
+    return entry
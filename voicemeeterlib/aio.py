@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Optional, Union
+
+from .factory import request_remote_obj
+from .remote import Remote
+from .subject import Subject
+
+logger = logging.getLogger(__name__)
+
+
+class EventForwarder:
+    """
+    Observer that forwards events from the Updater thread into an event loop.
+
+    Pending events are coalesced, an event type is queued at most once until consumed.
+
+    If the event loop has been closed the forwarder removes itself from the subject.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, subject: Subject):
+        self._loop = loop
+        self._subject = subject
+        self.queue = asyncio.Queue()
+        self._pending = set()
+
+    def on_update(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            self.remove()
+
+    def remove(self):
+        if self in self._subject.observers:
+            self._subject.remove(self)
+
+    def _put(self, event):
+        if event not in self._pending:
+            self._pending.add(event)
+            self.queue.put_nowait(event)
+
+    async def get(self) -> str:
+        event = await self.queue.get()
+        self._pending.discard(event)
+        return event
+
+
+class AsyncRemote:
+    """
+    asyncio front end for a Remote class of a kind.
+
+    DLL calls run in a worker thread, delays are awaited with asyncio.sleep.
+
+    Attributes not defined here are forwarded to the wrapped Remote.
+    """
+
+    def __init__(self, remote: Remote):
+        self._remote = remote
+        self.logger = logger.getChild(self.__class__.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._remote, name)
+
+    def __str__(self):
+        return str(self._remote)
+
+    async def __aenter__(self):
+        """setup procedures"""
+        await asyncio.to_thread(self._remote.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback) -> None:
+        """teardown procedures"""
+        await asyncio.to_thread(
+            self._remote.__exit__, exc_type, exc_value, exc_traceback
+        )
+
+    async def get(
+        self, param: str, is_string: Optional[bool] = False
+    ) -> Union[str, float]:
+        """Gets a string or float parameter"""
+        return await asyncio.to_thread(self._remote.get, param, is_string)
+
+    async def set(self, param: str, val: Union[str, float]) -> None:
+        """Sets a string or float parameter"""
+        await asyncio.to_thread(self._remote.set, param, val)
+
+    async def sendtext(self, script: Union[str, dict]):
+        """Sets many parameters from a script"""
+        await asyncio.to_thread(self._remote._sendtext, script)
+        await asyncio.sleep(self._remote.DELAY * 5)
+
+    async def apply(self, data: dict):
+        """
+        Sets all parameters of a dict
+
+        minor delay between each recursion
+        """
+        for key, di in data.items():
+            target = self._remote._target(key)
+            await asyncio.to_thread(target.apply, di)
+            await asyncio.sleep(self._remote.DELAY)
+
+    async def apply_config(self, name, diff: bool = False):
+        """
+        applies a config from memory, compiled into scripts on first use
+
+        If diff, only parameters that differ from their current value are written.
+        """
+        steps = self._remote._apply_config_steps(name, diff)
+        while (delay := await asyncio.to_thread(next, steps, None)) is not None:
+            await asyncio.sleep(delay)
+
+    async def events(self) -> AsyncIterator[str]:
+        """
+        Yields the name of each event as it is notified by the Updater thread.
+
+        Only subscribed events are yielded, see the events kwargs.
+        """
+        forwarder = EventForwarder(asyncio.get_running_loop(), self._remote.subject)
+        self._remote.subject.add(forwarder)
+        try:
+            while True:
+                yield await forwarder.get()
+        finally:
+            forwarder.remove()
+
+
+def request_async_remote_obj(kind_id: str, **kwargs) -> AsyncRemote:
+    """
+    asyncio interface entry point.
+
+    Returns an AsyncRemote wrapping a Remote class of a kind
+    """
+    return AsyncRemote(request_remote_obj(kind_id, **kwargs))
@@ -0,0 +1,208 @@
+"""
+Startup profiler.
+
+python -m voicemeeterlib.bench startup [--kind KIND] [--backend BACKEND] [--output FILE]
+python -m voicemeeterlib.bench calls [--kind KIND] [--number N] [--output FILE]
+
+startup reports the time taken by each startup phase as JSON, in milliseconds.
+On platforms other than Windows the simulator backend stands in for VoicemeeterRemote.
+
+calls reports the cost of the call layer per operation, in microseconds, against a stub
+that answers every function immediately.
+"""
+
+import argparse
+import functools
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from contextlib import contextmanager
+
+from .cbindings import request_backend
+from .kinds import KindId
+from .simulator import PROTOTYPES, make_functions
+
+
+class Stub:
+    """Answers every VBVMR function with 0 and writes nothing, only the call layer is measured"""
+
+    def __init__(self):
+        for name, func in make_functions(
+            {name: lambda *args: 0 for name in PROTOTYPES}
+        ).items():
+            setattr(self, name, func)
+
+
+@contextmanager
+def timed(phases: dict, name: str):
+    """Records the time spent in the block, in milliseconds"""
+    start = time.perf_counter()
+    yield
+    phases[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+@contextmanager
+def timed_steps(builder, steps: dict):
+    """Times each make_* step of the builder class while the block runs"""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def wrapper(self):
+            with timed(steps, fn.__name__):
+                return fn(self)
+
+        return wrapper
+
+    originals = {
+        name: fn for name, fn in vars(builder).items() if name.startswith("make_")
+    }
+    for name, fn in originals.items():
+        setattr(builder, name, wrap(fn))
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(builder, name, fn)
+
+
+def import_time(module: str = "voicemeeterlib.factory") -> float:
+    """
+    Imports module in a fresh interpreter with -X importtime.
+
+    Returns the cumulative import time of the package's top level imports, in milliseconds.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" voicemeeterlib") and cumulative.strip().isdigit():
+            total += int(cumulative)
+    return round(total / 1000, 3)
+
+
+def startup(kind_id: str, backend: str) -> dict:
+    """
+    Runs each startup phase once, in order.
+
+    The import phase runs in a fresh interpreter, this process has already imported the package.
+    Attributes built on first access are touched after api() returns, their steps are listed under lazy.
+    """
+    phases = {"import": import_time()}
+    factory = importlib.import_module("voicemeeterlib.factory")
+    with timed(phases, "backend"):
+        backend_obj = request_backend(backend, kind_id)
+    with timed(phases, "kindmap"):
+        factory.kindmap(kind_id)
+
+    steps, lazy = {}, {}
+    with timed_steps(factory.FactoryBuilder, steps):
+        with timed(phases, "api"):
+            vm = factory.request_remote_obj(kind_id, backend=backend_obj)
+        eager = dict(steps)
+        for name in dir(type(vm)):
+            if isinstance(getattr(type(vm), name), factory.LazyStep):
+                getattr(vm, name)
+        lazy = {k: v for k, v in steps.items() if k not in eager}
+
+    with timed(phases, "login"):
+        vm.login()
+    with timed(phases, "clear_dirty"):
+        vm.clear_dirty()
+    with timed(phases, "logout"):
+        vm.logout()
+
+    return {
+        "kind": kind_id,
+        "backend": backend,
+        "python": platform.python_version(),
+        "platform": platform.system(),
+        "timestamp": time.time(),
+        "unit": "ms",
+        "phases": phases,
+        "steps": eager,
+        "lazy": lazy,
+    }
+
+
+def calls(kind_id: str, number: int) -> dict:
+    """Times each operation number times, reports the mean per call of the fastest of 5 runs"""
+    factory = importlib.import_module("voicemeeterlib.factory")
+    vm = factory.request_remote_obj(kind_id, backend=Stub())
+    strip, bus = vm.strip[0], vm.bus[0]
+    ops = {
+        "call": lambda: vm.call(vm.bind_is_parameters_dirty, ok=(0, 1)),
+        "get": lambda: vm.get("Strip[0].Gain"),
+        "get_string": lambda: vm.get("Strip[0].Label", is_string=True),
+        "set": lambda: vm.set("Strip[0].Gain", -6.0),
+        "set_string": lambda: vm.set("Strip[0].Label", "label"),
+        "strip.gain": lambda: strip.gain,
+        "strip.gain=": lambda: setattr(strip, "gain", -6.0),
+        "bus.mute": lambda: bus.mute,
+        "get_level": lambda: vm.get_level(0, 0),
+        "levels_snapshot": vm.levels_snapshot,
+        "get_midi_message": vm.get_midi_message,
+    }
+    results = {}
+    for name, op in ops.items():
+        vm.cache.clear()
+        best = min(timeit.repeat(op, number=number, repeat=5))
+        results[name] = round(best / number * 1e6, 3)
+        vm.cache.clear()
+
+    return {
+        "kind": kind_id,
+        "python": platform.python_version(),
+        "platform": platform.system(),
+        "timestamp": time.time(),
+        "unit": "us",
+        "number": number,
+        "calls": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m voicemeeterlib.bench", description=__doc__.split("\n")[1]
+    )
+    sub = parser.add_subparsers(dest="bench", required=True)
+    parser_startup = sub.add_parser("startup", help="time each startup phase")
+    parser_startup.add_argument(
+        "--backend",
+        default="dll" if platform.system() == "Windows" else "simulator",
+        choices=("dll", "simulator"),
+    )
+    parser_calls = sub.add_parser("calls", help="time the call layer per operation")
+    parser_calls.add_argument("--number", type=int, default=10000)
+    for parser_ in (parser_startup, parser_calls):
+        parser_.add_argument(
+            "--kind",
+            default="potato",
+            choices=tuple(kind_id.name.lower() for kind_id in KindId),
+        )
+        parser_.add_argument("--output", help="write the JSON to a file")
+    args = parser.parse_args(argv)
+
+    if args.bench == "startup":
+        result = startup(args.kind, args.backend)
+    else:
+        result = calls(args.kind, args.number)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
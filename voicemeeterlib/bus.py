@@ -1,12 +1,14 @@
 import time
 from abc import abstractmethod
 from enum import IntEnum
-from math import log
+from functools import cache
 from typing import Union
 
+from . import history, levels
 from .iremote import IRemote
 from .kinds import kinds_all
-from .meta import bus_mode_prop, device_prop, float_prop
+from .meta import schema_props
+from .schema import request_schema
 
 BusModes = IntEnum(
     "BusModes",
@@ -22,6 +24,14 @@ class Bus(IRemote):
     Defines concrete implementation for bus
     """
 
+    __slots__ = ("levels", "mode", "eq")
+
+    def __init__(self, remote, index):
+        super().__init__(remote, index)
+        self.levels = BusLevel(remote, index)
+        self.mode = BusModeMixin.make(remote.kind.name)(remote, index)
+        self.eq = BusEQ(remote, index)
+
     @abstractmethod
     def __str__(self):
         pass
@@ -88,6 +98,8 @@ class Bus(IRemote):
 
 
 class BusEQ(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return f"Bus[{self.index}].eq"
@@ -110,53 +122,52 @@ class BusEQ(IRemote):
 
 
 class PhysicalBus(Bus):
+    __slots__ = ("device",)
+
     @classmethod
-    def make(cls, remote, i, kind):
+    @cache
+    def make(cls, kind_id: str):
         """
         Factory method for PhysicalBus.
 
-        Returns a PhysicalBus class.
+        Returns a PhysicalBus class of a kind, generated once from its schema.
         """
-        kls = (cls,)
-        if kind.name == "potato":
-            EFFECTS_cls = _make_effects_mixin()
-            kls += (EFFECTS_cls,)
         return type(
-            "PhysicalBus",
-            kls,
+            f"PhysicalBus{kind_id.capitalize()}",
+            (cls,),
             {
-                "device": BusDevice.make(remote, i),
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["PhysicalBus"], cls),
             },
         )
 
+    def __init__(self, remote, index):
+        super().__init__(remote, index)
+        self.device = BusDevice.make(remote.kind.name)(remote, index)
+
     def __str__(self):
         return f"{type(self).__name__}{self.index}"
 
 
 class BusDevice(IRemote):
+    __slots__ = ()
+
     @classmethod
-    def make(cls, remote, i):
+    @cache
+    def make(cls, kind_id: str):
         """
-        Factory function for bus.device.
+        Factory method for bus.device.
 
         Returns a BusDevice class of a kind.
         """
-        DEVICE_cls = type(
-            f"BusDevice{remote.kind}",
+        return type(
+            f"BusDevice{kind_id.capitalize()}",
             (cls,),
             {
-                **{
-                    param: device_prop(param)
-                    for param in [
-                        "wdm",
-                        "ks",
-                        "mme",
-                        "asio",
-                    ]
-                },
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["BusDevice"], cls),
             },
         )
-        return DEVICE_cls(remote, i)
 
     @property
     def identifier(self) -> str:
@@ -172,56 +183,63 @@ class BusDevice(IRemote):
 
 
 class VirtualBus(Bus):
+    __slots__ = ("device",)
+
     @classmethod
-    def make(cls, remote, i, kind):
+    @cache
+    def make(cls, kind_id: str):
         """
         Factory method for VirtualBus.
 
-        If basic kind subclass physical bus.
-
-        Returns a VirtualBus class.
+        Returns a VirtualBus class of a kind, generated once from its schema.
         """
-        kls = (cls,)
-        if kind.name == "basic":
-            return type(
-                "VirtualBus",
-                kls,
-                {
-                    "device": BusDevice.make(remote, i),
-                },
-            )
-        elif kind.name == "potato":
-            EFFECTS_cls = _make_effects_mixin()
-            kls += (EFFECTS_cls,)
-        return type("VirtualBus", kls, {})
+        return type(
+            f"VirtualBus{kind_id.capitalize()}",
+            (cls,),
+            {
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["VirtualBus"], cls),
+            },
+        )
+
+    def __init__(self, remote, index):
+        super().__init__(remote, index)
+        if remote.kind.name == "basic":
+            self.device = BusDevice.make(remote.kind.name)(remote, index)
 
     def __str__(self):
         return f"{type(self).__name__}{self.index}"
 
 
 class BusLevel(IRemote):
+    __slots__ = ("range", "_mask")
+
     def __init__(self, remote, index):
         super().__init__(remote, index)
         self.range = _make_bus_level_maps[remote.kind.name][self.index]
+        self._mask = bus_channel_maps[remote.kind.name].masks[self.index]
 
     def getter(self, mode):
         """
         Returns a tuple of level values for the channel.
 
-        If observables thread running and level updates are subscribed to, fetch values from cache
+        If observables thread running and level updates are subscribed to, slice the converted frame in cache
 
-        Otherwise call CAPI func.
+        Otherwise call CAPI func and convert the values for this channel.
+        The mode is then subscribed to so the events thread caches it from the next poll,
+        until remote.unsubscribe_level(mode) is called.
         """
-
-        def fget(x):
-            return round(20 * log(x, 10), 1) if x > 0 else -200.0
-
-        if not self._remote.stopped() and self._remote.event.ldirty:
-            vals = self._remote.cache["bus_level"][self.range[0] : self.range[-1]]
-        else:
-            vals = [self._remote.get_level(mode, i) for i in range(*self.range)]
-
-        return tuple(fget(val) for val in vals)
+        remote = self._remote
+        if not remote.stopped() and remote.event.ldirty:
+            if (
+                remote._level_mask >> mode & 1
+                and (frame := remote.cache["levels_db"].get(mode)) is not None
+            ):
+                return frame[self.range[0] : self.range[-1]]
+            remote.subscribe_level(mode)
+        return levels.convert(
+            [self._remote.get_level(mode, i) for i in range(*self.range)]
+        )
 
     @property
     def identifier(self) -> str:
@@ -239,10 +257,26 @@ class BusLevel(IRemote):
         Expected to be used in a callback only.
         """
         if not self._remote.stopped():
-            return any(self._remote._bus_comp[self.range[0] : self.range[-1]])
+            return bool(self._remote._level_dirty[1] & self._mask)
 
     is_updated = isdirty
 
+    def peak_hold(self) -> tuple:
+        """Returns the peak of each channel held for peak_hold frames, in dB. Requires level history"""
+        return history.stat(self._remote, "peak_hold", 3, self.range)
+
+    def rms(self) -> tuple:
+        """Returns the RMS of each channel over the history, in dB. Requires level history"""
+        return history.stat(self._remote, "rms", 3, self.range)
+
+    def average(self) -> tuple:
+        """Returns the average of each channel over the history, in dB. Requires level history"""
+        return history.stat(self._remote, "average", 3, self.range)
+
+    def clips(self) -> tuple:
+        """Returns the number of clipped frames per channel in the history. Requires level history"""
+        return history.stat(self._remote, "clips", 3, self.range)
+
 
 def make_bus_level_map(kind):
     return tuple((i, i + 8) for i in range(0, (kind.phys_out + kind.virt_out) * 8, 8))
@@ -250,80 +284,65 @@ def make_bus_level_map(kind):
 
 _make_bus_level_maps = {kind.name: make_bus_level_map(kind) for kind in kinds_all}
 
+bus_channel_maps = {
+    name: levels.ChannelMap(level_map)
+    for name, level_map in _make_bus_level_maps.items()
+}
+
+
+class BusModeMixin(IRemote):
+    __slots__ = ()
 
-def _make_bus_mode_mixin():
-    """Creates a mixin of Bus Modes."""
+    @classmethod
+    @cache
+    def make(cls, kind_id: str):
+        """
+        Factory method for bus.mode.
 
+        Returns a BusModeMixin class of a kind.
+        """
+        return type(
+            f"BusModeMixin{kind_id.capitalize()}",
+            (cls,),
+            {"__slots__": (), **schema_props(request_schema(kind_id)["BusMode"], cls)},
+        )
+
+    @property
     def identifier(self) -> str:
         return f"Bus[{self.index}].mode"
 
     def get(self) -> str:
-        time.sleep(0.01)
-        for i, val in enumerate(
-            [
-                self.amix,
-                self.bmix,
-                self.repeat,
-                self.composite,
-                self.tvmix,
-                self.upmix21,
-                self.upmix41,
-                self.upmix61,
-                self.centeronly,
-                self.lfeonly,
-                self.rearonly,
-            ]
-        ):
-            if val:
-                return BusModes(i + 1).name
-        return "normal"
-
-    return type(
-        "BusModeMixin",
-        (IRemote,),
-        {
-            "identifier": property(identifier),
-            **{mode.name: bus_mode_prop(mode.name) for mode in BusModes},
-            "get": get,
-        },
-    )
-
-
-def _make_effects_mixin():
-    """creates an fx mixin"""
-    return type(
-        "FX",
-        (),
-        {
-            **{
-                f"return{param}": float_prop(f"return{param}")
-                for param in ["reverb", "delay", "fx1", "fx2"]
-            },
-        },
-    )
+        """Returns the name of the current bus mode, dirty parameters are cleared once"""
+        self._remote.clear_dirty()
+        return self.read().name
+
+    def read(self) -> BusModes:
+        """
+        Reads the mode flags in order until one is set.
+
+        Dirty parameters are not cleared, see get() and {Remote}.bus_modes().
+        """
+        cache = self._remote.cache
+        for mode in BusModes:
+            if mode is BusModes.normal:
+                continue
+            cmd = self._cmd(mode.name)
+            val = cache.pop(cmd) if cmd in cache else self._remote._get(cmd)
+            if val == 1:
+                return mode
+        return BusModes.normal
 
 
 def bus_factory(is_phys_bus, remote, i) -> Union[PhysicalBus, VirtualBus]:
     """
     Factory method for buses
 
+    Bus classes are generated once per kind and reused
+
     Returns a physical or virtual bus subclass
     """
-    BUS_cls = (
-        PhysicalBus.make(remote, i, remote.kind)
-        if is_phys_bus
-        else VirtualBus.make(remote, i, remote.kind)
-    )
-    BUSMODEMIXIN_cls = _make_bus_mode_mixin()
-    return type(
-        f"{BUS_cls.__name__}{remote.kind}",
-        (BUS_cls,),
-        {
-            "levels": BusLevel(remote, i),
-            "mode": BUSMODEMIXIN_cls(remote, i),
-            "eq": BusEQ(remote, i),
-        },
-    )(remote, i)
+    BUS_cls = PhysicalBus if is_phys_bus else VirtualBus
+    return BUS_cls.make(remote.kind.name)(remote, i)
 
 
 def request_bus_obj(phys_bus, remote, i) -> Bus:
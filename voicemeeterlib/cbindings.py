@@ -2,124 +2,193 @@ import ctypes as ct
 import logging
 from abc import ABCMeta
 from ctypes.wintypes import CHAR, FLOAT, LONG, WCHAR
+from functools import lru_cache
 
 from .error import CAPIError
-from .inst import libc
 
 logger = logging.getLogger(__name__)
 
+OK = (0,)
+OK_DIRTY = (0, 1)
+OK_NO_MIDI = (-5, -6)  # no data received from midi device
+
+
+def non_negative(res: int) -> bool:
+    """Checker for functions returning a count"""
+    return res >= 0
+
+
+@lru_cache(maxsize=4096)
+def encode(param: str) -> bytes:
+    """Parameter names are encoded once, later lookups are served from the cache"""
+    return param.encode()
+
+
+class Buffers:
+    """Output buffers for a thread, reused between calls along with their byrefs"""
+
+    __slots__ = (
+        "float",
+        "float_ref",
+        "string",
+        "string_ref",
+        "midi",
+        "midi_ref",
+        "levels",
+    )
+
+    def __init__(self):
+        self.float = ct.c_float()
+        self.float_ref = ct.byref(self.float)
+        self.string = ct.create_unicode_buffer(512)
+        self.string_ref = ct.byref(self.string)
+        self.midi = ct.create_string_buffer(1024)
+        self.midi_ref = ct.byref(self.midi)
+        self.levels = {}
+
 
 class CBindings(metaclass=ABCMeta):
     """
     C bindings defined here.
 
     Maps expected ctype argument and res types for each binding.
+
+    Functions are bound per instance from a backend, see request_backend().
     """
 
     logger_cbindings = logger.getChild("CBindings")
 
-    bind_login = libc.VBVMR_Login
-    bind_login.restype = LONG
-    bind_login.argtypes = None
-
-    bind_logout = libc.VBVMR_Logout
-    bind_logout.restype = LONG
-    bind_logout.argtypes = None
-
-    bind_run_voicemeeter = libc.VBVMR_RunVoicemeeter
-    bind_run_voicemeeter.restype = LONG
-    bind_run_voicemeeter.argtypes = [LONG]
-
-    bind_get_voicemeeter_type = libc.VBVMR_GetVoicemeeterType
-    bind_get_voicemeeter_type.restype = LONG
-    bind_get_voicemeeter_type.argtypes = [ct.POINTER(LONG)]
-
-    bind_get_voicemeeter_version = libc.VBVMR_GetVoicemeeterVersion
-    bind_get_voicemeeter_version.restype = LONG
-    bind_get_voicemeeter_version.argtypes = [ct.POINTER(LONG)]
-
-    if hasattr(libc, "VBVMR_MacroButton_IsDirty"):
-        bind_macro_button_is_dirty = libc.VBVMR_MacroButton_IsDirty
-        bind_macro_button_is_dirty.restype = LONG
-        bind_macro_button_is_dirty.argtypes = None
-
-    if hasattr(libc, "VBVMR_MacroButton_GetStatus"):
-        bind_macro_button_get_status = libc.VBVMR_MacroButton_GetStatus
-        bind_macro_button_get_status.restype = LONG
-        bind_macro_button_get_status.argtypes = [LONG, ct.POINTER(FLOAT), LONG]
-
-    if hasattr(libc, "VBVMR_MacroButton_SetStatus"):
-        bind_macro_button_set_status = libc.VBVMR_MacroButton_SetStatus
-        bind_macro_button_set_status.restype = LONG
-        bind_macro_button_set_status.argtypes = [LONG, FLOAT, LONG]
-
-    bind_is_parameters_dirty = libc.VBVMR_IsParametersDirty
-    bind_is_parameters_dirty.restype = LONG
-    bind_is_parameters_dirty.argtypes = None
-
-    bind_get_parameter_float = libc.VBVMR_GetParameterFloat
-    bind_get_parameter_float.restype = LONG
-    bind_get_parameter_float.argtypes = [ct.POINTER(CHAR), ct.POINTER(FLOAT)]
-
-    bind_set_parameter_float = libc.VBVMR_SetParameterFloat
-    bind_set_parameter_float.restype = LONG
-    bind_set_parameter_float.argtypes = [ct.POINTER(CHAR), FLOAT]
-
-    bind_get_parameter_string_w = libc.VBVMR_GetParameterStringW
-    bind_get_parameter_string_w.restype = LONG
-    bind_get_parameter_string_w.argtypes = [ct.POINTER(CHAR), ct.POINTER(WCHAR * 512)]
-
-    bind_set_parameter_string_w = libc.VBVMR_SetParameterStringW
-    bind_set_parameter_string_w.restype = LONG
-    bind_set_parameter_string_w.argtypes = [ct.POINTER(CHAR), ct.POINTER(WCHAR)]
-
-    bind_set_parameters = libc.VBVMR_SetParameters
-    bind_set_parameters.restype = LONG
-    bind_set_parameters.argtypes = [ct.POINTER(CHAR)]
-
-    bind_get_level = libc.VBVMR_GetLevel
-    bind_get_level.restype = LONG
-    bind_get_level.argtypes = [LONG, LONG, ct.POINTER(FLOAT)]
-
-    bind_input_get_device_number = libc.VBVMR_Input_GetDeviceNumber
-    bind_input_get_device_number.restype = LONG
-    bind_input_get_device_number.argtypes = None
-
-    bind_input_get_device_desc_w = libc.VBVMR_Input_GetDeviceDescW
-    bind_input_get_device_desc_w.restype = LONG
-    bind_input_get_device_desc_w.argtypes = [
-        LONG,
-        ct.POINTER(LONG),
-        ct.POINTER(WCHAR * 256),
-        ct.POINTER(WCHAR * 256),
-    ]
-
-    bind_output_get_device_number = libc.VBVMR_Output_GetDeviceNumber
-    bind_output_get_device_number.restype = LONG
-    bind_output_get_device_number.argtypes = None
-
-    bind_output_get_device_desc_w = libc.VBVMR_Output_GetDeviceDescW
-    bind_output_get_device_desc_w.restype = LONG
-    bind_output_get_device_desc_w.argtypes = [
-        LONG,
-        ct.POINTER(LONG),
-        ct.POINTER(WCHAR * 256),
-        ct.POINTER(WCHAR * 256),
-    ]
-
-    bind_get_midi_message = libc.VBVMR_GetMidiMessage
-    bind_get_midi_message.restype = LONG
-    bind_get_midi_message.argtypes = [ct.POINTER(CHAR * 1024), LONG]
-
-    def call(self, func, *args, ok=(0,), ok_exp=None):
-        try:
-            res = func(*args)
-            if ok_exp is None:
-                if res not in ok:
-                    raise CAPIError(func.__name__, res)
-            elif not ok_exp(res) and res not in ok:
-                raise CAPIError(func.__name__, res)
+    def bind(self, libc):
+        """Binds each function of a backend, the DLL or an object that stands in for it"""
+        self.bind_login = libc.VBVMR_Login
+        self.bind_login.restype = LONG
+        self.bind_login.argtypes = None
+
+        self.bind_logout = libc.VBVMR_Logout
+        self.bind_logout.restype = LONG
+        self.bind_logout.argtypes = None
+
+        self.bind_run_voicemeeter = libc.VBVMR_RunVoicemeeter
+        self.bind_run_voicemeeter.restype = LONG
+        self.bind_run_voicemeeter.argtypes = [LONG]
+
+        self.bind_get_voicemeeter_type = libc.VBVMR_GetVoicemeeterType
+        self.bind_get_voicemeeter_type.restype = LONG
+        self.bind_get_voicemeeter_type.argtypes = [ct.POINTER(LONG)]
+
+        self.bind_get_voicemeeter_version = libc.VBVMR_GetVoicemeeterVersion
+        self.bind_get_voicemeeter_version.restype = LONG
+        self.bind_get_voicemeeter_version.argtypes = [ct.POINTER(LONG)]
+
+        if hasattr(libc, "VBVMR_MacroButton_IsDirty"):
+            self.bind_macro_button_is_dirty = libc.VBVMR_MacroButton_IsDirty
+            self.bind_macro_button_is_dirty.restype = LONG
+            self.bind_macro_button_is_dirty.argtypes = None
+
+        if hasattr(libc, "VBVMR_MacroButton_GetStatus"):
+            self.bind_macro_button_get_status = libc.VBVMR_MacroButton_GetStatus
+            self.bind_macro_button_get_status.restype = LONG
+            self.bind_macro_button_get_status.argtypes = [LONG, ct.POINTER(FLOAT), LONG]
+
+        if hasattr(libc, "VBVMR_MacroButton_SetStatus"):
+            self.bind_macro_button_set_status = libc.VBVMR_MacroButton_SetStatus
+            self.bind_macro_button_set_status.restype = LONG
+            self.bind_macro_button_set_status.argtypes = [LONG, FLOAT, LONG]
+
+        self.bind_is_parameters_dirty = libc.VBVMR_IsParametersDirty
+        self.bind_is_parameters_dirty.restype = LONG
+        self.bind_is_parameters_dirty.argtypes = None
+
+        self.bind_get_parameter_float = libc.VBVMR_GetParameterFloat
+        self.bind_get_parameter_float.restype = LONG
+        self.bind_get_parameter_float.argtypes = [ct.POINTER(CHAR), ct.POINTER(FLOAT)]
+
+        self.bind_set_parameter_float = libc.VBVMR_SetParameterFloat
+        self.bind_set_parameter_float.restype = LONG
+        self.bind_set_parameter_float.argtypes = [ct.POINTER(CHAR), FLOAT]
+
+        self.bind_get_parameter_string_w = libc.VBVMR_GetParameterStringW
+        self.bind_get_parameter_string_w.restype = LONG
+        self.bind_get_parameter_string_w.argtypes = [
+            ct.POINTER(CHAR),
+            ct.POINTER(WCHAR * 512),
+        ]
+
+        self.bind_set_parameter_string_w = libc.VBVMR_SetParameterStringW
+        self.bind_set_parameter_string_w.restype = LONG
+        self.bind_set_parameter_string_w.argtypes = [
+            ct.POINTER(CHAR),
+            ct.POINTER(WCHAR),
+        ]
+
+        self.bind_set_parameters = libc.VBVMR_SetParameters
+        self.bind_set_parameters.restype = LONG
+        self.bind_set_parameters.argtypes = [ct.POINTER(CHAR)]
+
+        self.bind_get_level = libc.VBVMR_GetLevel
+        self.bind_get_level.restype = LONG
+        self.bind_get_level.argtypes = [LONG, LONG, ct.POINTER(FLOAT)]
+
+        self.bind_input_get_device_number = libc.VBVMR_Input_GetDeviceNumber
+        self.bind_input_get_device_number.restype = LONG
+        self.bind_input_get_device_number.argtypes = None
+
+        self.bind_input_get_device_desc_w = libc.VBVMR_Input_GetDeviceDescW
+        self.bind_input_get_device_desc_w.restype = LONG
+        self.bind_input_get_device_desc_w.argtypes = [
+            LONG,
+            ct.POINTER(LONG),
+            ct.POINTER(WCHAR * 256),
+            ct.POINTER(WCHAR * 256),
+        ]
+
+        self.bind_output_get_device_number = libc.VBVMR_Output_GetDeviceNumber
+        self.bind_output_get_device_number.restype = LONG
+        self.bind_output_get_device_number.argtypes = None
+
+        self.bind_output_get_device_desc_w = libc.VBVMR_Output_GetDeviceDescW
+        self.bind_output_get_device_desc_w.restype = LONG
+        self.bind_output_get_device_desc_w.argtypes = [
+            LONG,
+            ct.POINTER(LONG),
+            ct.POINTER(WCHAR * 256),
+            ct.POINTER(WCHAR * 256),
+        ]
+
+        self.bind_get_midi_message = libc.VBVMR_GetMidiMessage
+        self.bind_get_midi_message.restype = LONG
+        self.bind_get_midi_message.argtypes = [ct.POINTER(CHAR * 1024), LONG]
+
+    def call(self, func, *args, ok=OK, ok_exp=None):
+        """
+        Calls a bound function, raises CAPIError unless its return code is in ok or passes ok_exp.
+
+        Pass one of the module level checkers as ok_exp rather than building one per call.
+        """
+        res = func(*args)
+        if res in ok or (ok_exp is not None and ok_exp(res)):
             return res
-        except CAPIError as e:
-            self.logger_cbindings.exception(f"{type(e).__name__}: {e}")
-            raise
+        e = CAPIError(func.__name__, res)
+        self.logger_cbindings.error(f"{type(e).__name__}: {e}")
+        raise e
+
+
+def request_backend(backend, kind_id: str):
+    """
+    Backend entry point.
+
+    "dll" loads VoicemeeterRemote, "simulator" returns an in-memory Simulator of a kind.
+    Any other object is returned as is, it must provide the VBVMR functions.
+    """
+    match backend:
+        case "dll":
+            from .inst import load_dll
+
+            return load_dll()
+        case "simulator":
+            from .simulator import Simulator
+
+            return Simulator(kind_id)
+        case str():
+            raise ValueError(f"Unknown backend '{backend}'")
+    return backend
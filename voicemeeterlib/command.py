@@ -9,27 +9,24 @@ class Command(IRemote):
     Defines concrete implementation for command
     """
 
+    __slots__ = ()
+
+    show = action_fn("show")
+    shutdown = action_fn("shutdown")
+    restart = action_fn("restart")
+    hide = action_fn("show", val=0)
+
     @classmethod
     def make(cls, remote):
         """
         Factory function for command class.
 
-        Returns a Command class of a kind.
+        Returns a Command of a kind.
         """
-        CMD_cls = type(
-            f"Command{remote.kind}",
-            (cls,),
-            {
-                **{
-                    param: action_fn(param) for param in ["show", "shutdown", "restart"]
-                },
-                "hide": action_fn("show", val=0),
-            },
-        )
-        return CMD_cls(remote)
+        return cls(remote)
 
     def __str__(self):
-        return f"{type(self).__name__}"
+        return f"{type(self).__name__}{self._remote.kind}"
 
     @property
     def identifier(self) -> str:
@@ -7,6 +7,8 @@ from .iremote import IRemote
 class Adapter(IRemote):
     """Adapter to the common interface."""
 
+    __slots__ = ()
+
     @abstractmethod
     def ins(self):
         pass
@@ -38,32 +40,27 @@ class Adapter(IRemote):
 class Device(Adapter):
     """Defines concrete implementation for device"""
 
+    __slots__ = ()
+
     @classmethod
     def make(cls, remote):
         """
         Factory function for device.
 
-        Returns a Device class of a kind.
+        Returns a Device of a kind.
         """
+        return cls(remote)
 
-        def num_ins(cls) -> int:
-            return cls.getter(direction="in")
-
-        def num_outs(cls) -> int:
-            return cls.getter(direction="out")
+    def __str__(self):
+        return f"{type(self).__name__}{self._remote.kind}"
 
-        DEVICE_cls = type(
-            f"Device{remote.kind}",
-            (cls,),
-            {
-                "ins": property(num_ins),
-                "outs": property(num_outs),
-            },
-        )
-        return DEVICE_cls(remote)
+    @property
+    def ins(self) -> int:
+        return self.getter(direction="in")
 
-    def __str__(self):
-        return f"{type(self).__name__}"
+    @property
+    def outs(self) -> int:
+        return self.getter(direction="out")
 
     def input(self, index: int) -> dict:
         return self.getter(index=index, direction="in")
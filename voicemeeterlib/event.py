@@ -7,8 +7,9 @@ logger = logging.getLogger(__name__)
 class Event:
     """Keeps track of event subscriptions"""
 
-    def __init__(self, subs: dict):
+    def __init__(self, subs: dict, rates: dict):
         self.subs = subs
+        self.rates = rates
         self.logger = logger.getChild(self.__class__.__name__)
 
     def info(self, msg=None):
@@ -1,7 +1,8 @@
 import logging
+import threading
 from abc import abstractmethod
 from enum import IntEnum
-from functools import cached_property
+from functools import cached_property, partial
 from typing import Iterable
 
 from . import misc
@@ -10,11 +11,13 @@ from .command import Command
 from .config import request_config as configs
 from .device import Device
 from .error import VMError
+from .iremote import IndexedView
 from .kinds import KindMapClass
 from .kinds import request_kind_map as kindmap
 from .macrobutton import MacroButton
 from .recorder import Recorder
 from .remote import Remote
+from .schema import request_schema
 from .strip import request_strip_obj as strip
 from .vban import request_vban_obj as vban
 
@@ -75,7 +78,7 @@ class FactoryBuilder:
         return self
 
     def make_macrobutton(self):
-        self._factory.button = tuple(MacroButton(self._factory, i) for i in range(80))
+        self._factory.button = IndexedView(partial(MacroButton, self._factory), 80)
         return self
 
     def make_vban(self):
@@ -103,18 +106,57 @@ class FactoryBuilder:
         return self
 
 
+class LazyStep:
+    """
+    Runs a builder step the first time the attribute it is named for is accessed.
+
+    The step sets the attribute on the instance, later lookups don't reach the descriptor.
+    """
+
+    def __init__(self, step: str):
+        self._step = step
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with self._lock:
+            if self._name not in vars(obj):
+                step = getattr(obj.builder, self._step)
+                step()._pinfo(step.__name__)
+        return vars(obj)[self._name]
+
+
 class FactoryBase(Remote):
-    """Base class for factories, subclasses Remote."""
+    """
+    Base class for factories, subclasses Remote.
+
+    Strips, buses, command and option are built eagerly, the remaining attributes on first access.
+    """
+
+    button = LazyStep("make_macrobutton")
+    vban = LazyStep("make_vban")
+    device = LazyStep("make_device")
 
     def __init__(self, kind_id: str, **kwargs):
         defaultkwargs = {
             "sync": False,
             "ratelimit": 0.033,
+            "rates": {},
             "pdirty": False,
             "mdirty": False,
             "midi": False,
             "ldirty": False,
             "timeout": 2,
+            "backend": "dll",
+            "metrics": False,
+            "history": 0,
+            "peak_hold": None,
+            "level_threshold": 0.0,
+            "level_interval": 0.0,
         }
         if "subs" in kwargs:
             defaultkwargs |= kwargs.pop("subs")  # for backwards compatibility
@@ -126,9 +168,6 @@ class FactoryBase(Remote):
             self.builder.make_strip,
             self.builder.make_bus,
             self.builder.make_command,
-            self.builder.make_macrobutton,
-            self.builder.make_vban,
-            self.builder.make_device,
             self.builder.make_option,
         )
         self._configs = None
@@ -141,6 +180,11 @@ class FactoryBase(Remote):
     def steps(self):
         pass
 
+    @property
+    def schema(self) -> dict:
+        """Returns the strip and bus parameter schema for this kind"""
+        return request_schema(self.kind.name)
+
     @cached_property
     def configs(self):
         self._configs = configs(self.kind.name)
@@ -176,6 +220,9 @@ class BananaFactory(FactoryBase):
     Responsible for directing the builder class
     """
 
+    recorder = LazyStep("make_recorder")
+    patch = LazyStep("make_patch")
+
     def __new__(cls, *args, **kwargs):
         if cls is BananaFactory:
             raise TypeError(f"'{cls.__name__}' does not support direct instantiation")
@@ -188,7 +235,7 @@ class BananaFactory(FactoryBase):
     @property
     def steps(self) -> Iterable:
         """steps required to build the interface for a kind"""
-        return self._steps + (self.builder.make_recorder, self.builder.make_patch)
+        return self._steps
 
 
 class PotatoFactory(FactoryBase):
@@ -198,6 +245,10 @@ class PotatoFactory(FactoryBase):
     Responsible for directing the builder class
     """
 
+    recorder = LazyStep("make_recorder")
+    patch = LazyStep("make_patch")
+    fx = LazyStep("make_fx")
+
     def __new__(cls, *args, **kwargs):
         if cls is PotatoFactory:
             raise TypeError(f"'{cls.__name__}' does not support direct instantiation")
@@ -210,11 +261,7 @@ class PotatoFactory(FactoryBase):
     @property
     def steps(self) -> Iterable:
         """steps required to build the interface for a kind"""
-        return self._steps + (
-            self.builder.make_recorder,
-            self.builder.make_patch,
-            self.builder.make_fx,
-        )
+        return self._steps
 
 
 def remote_factory(kind_id: str, **kwargs) -> Remote:
@@ -0,0 +1,173 @@
+import threading
+from math import sqrt
+from typing import Optional
+
+from . import levels
+from .error import VMError
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+CLIP = 1.0  # 0 dBFS
+
+
+class LevelRing:
+    """
+    Fixed-size ring of raw level frames for one level mode.
+
+    Running sums, sums of squares and clip counts are kept per channel as frames are pushed,
+    so windowed RMS, average and clip counts are read without walking the ring.
+
+    A channel's peak is held for hold frames, then follows the signal again.
+    """
+
+    def __init__(self, num_channels: int, size: int, hold: int):
+        self.size = size
+        self.hold = hold
+        self.count = 0
+        if np is not None:
+            self.frames = np.zeros((size, num_channels), dtype=np.float32)
+            self.sums = np.zeros(num_channels)
+            self.sumsq = np.zeros(num_channels)
+            self.clipped = np.zeros(num_channels, dtype=np.int64)
+            self.peaks = np.zeros(num_channels)
+            self.peak_at = np.zeros(num_channels, dtype=np.int64)
+        else:
+            self.frames = [None] * size
+            self.sums = [0.0] * num_channels
+            self.sumsq = [0.0] * num_channels
+            self.clipped = [0] * num_channels
+            self.peaks = [0.0] * num_channels
+            self.peak_at = [0] * num_channels
+
+    @property
+    def window(self) -> int:
+        """Number of frames held, at most size"""
+        return min(self.count, self.size)
+
+    def push(self, frame):
+        i = self.count % self.size
+        if i == 0 and self.count:
+            self._resum()
+        if np is not None:
+            self._push_numpy(i, frame)
+        else:
+            self._push_python(i, frame)
+        self.count += 1
+
+    def _push_numpy(self, i: int, frame):
+        new = np.asarray(frame, dtype=np.float32)
+        old = self.frames[i].astype(np.float64)
+        self.frames[i] = new
+        new = new.astype(np.float64)
+        self.sums += new - old
+        self.sumsq += new * new - old * old
+        self.clipped += (new >= CLIP).astype(np.int64) - (old >= CLIP)
+        reset = (new >= self.peaks) | (self.count - self.peak_at >= self.hold)
+        self.peaks[reset] = new[reset]
+        self.peak_at[reset] = self.count
+
+    def _push_python(self, i: int, frame):
+        old = self.frames[i] or (0.0,) * len(frame)
+        self.frames[i] = frame
+        n = self.count
+        sums, sumsq, clipped = self.sums, self.sumsq, self.clipped
+        peaks, peak_at = self.peaks, self.peak_at
+        for c, (x, o) in enumerate(zip(frame, old)):
+            sums[c] += x - o
+            sumsq[c] += x * x - o * o
+            clipped[c] += (x >= CLIP) - (o >= CLIP)
+            if x >= peaks[c] or n - peak_at[c] >= self.hold:
+                peaks[c] = x
+                peak_at[c] = n
+
+    def _resum(self):
+        """Recomputes the running sums once per lap of the ring, so rounding errors don't accumulate"""
+        if np is not None:
+            frames = self.frames.astype(np.float64)
+            self.sums = frames.sum(axis=0)
+            self.sumsq = (frames * frames).sum(axis=0)
+        else:
+            self.sums = [sum(ch) for ch in zip(*self.frames)]
+            self.sumsq = [sum(x * x for x in ch) for ch in zip(*self.frames)]
+
+    def _slice(self, values, lo: int, hi: int) -> list:
+        if np is not None:
+            return values[lo:hi].tolist()
+        return values[lo:hi]
+
+    def peak_hold(self, lo: int, hi: int) -> tuple:
+        return levels.convert(self._slice(self.peaks, lo, hi))
+
+    def rms(self, lo: int, hi: int) -> tuple:
+        n = self.window
+        return levels.convert(
+            [sqrt(max(x, 0.0) / n) for x in self._slice(self.sumsq, lo, hi)]
+        )
+
+    def average(self, lo: int, hi: int) -> tuple:
+        n = self.window
+        return levels.convert([max(x, 0.0) / n for x in self._slice(self.sums, lo, hi)])
+
+    def clips(self, lo: int, hi: int) -> tuple:
+        return tuple(int(x) for x in self._slice(self.clipped, lo, hi))
+
+
+class LevelHistory:
+    """
+    Recent level frames for each level mode, pushed by the events thread.
+
+    size is the number of frames kept per level mode, memory is bounded by size * channels.
+    hold is the number of frames a peak is held for, it defaults to size.
+    """
+
+    def __init__(self, size: int, hold: Optional[int] = None):
+        if size < 1:
+            raise ValueError("history size must be at least 1 frame")
+        self.size = size
+        self.hold = hold or size
+        self.rings = {}
+        self._lock = threading.Lock()
+
+    def push(self, frames: dict):
+        """Pushes a frame for each level mode, {mode: raw frame}"""
+        with self._lock:
+            for mode, frame in frames.items():
+                try:
+                    ring = self.rings[mode]
+                except KeyError:
+                    ring = self.rings[mode] = LevelRing(
+                        len(frame), self.size, self.hold
+                    )
+                ring.push(frame)
+
+    def clear(self):
+        with self._lock:
+            self.rings.clear()
+
+    def get(self, stat: str, mode: int, range_: tuple) -> Optional[tuple]:
+        """
+        Returns a stat for the channels in range_ of a level mode.
+
+        None if no frames have been pushed for the mode.
+        """
+        with self._lock:
+            if (ring := self.rings.get(mode)) is None:
+                return None
+            return getattr(ring, stat)(*range_)
+
+
+def stat(remote, name: str, mode: int, range_: tuple) -> tuple:
+    """
+    Returns a history stat for a strip or bus level.
+
+    If no frames have been pushed for the mode yet it is subscribed to, silence is returned.
+    """
+    if not remote.history:
+        raise VMError("Level history not enabled, pass history=<frames> to api()")
+    if (vals := remote.history.get(name, mode, range_)) is None:
+        remote.subscribe_level(mode)
+        return (0 if name == "clips" else levels.FLOOR,) * (range_[-1] - range_[0])
+    return vals
@@ -1,14 +1,14 @@
 import ctypes as ct
 import platform
-import winreg
+from functools import cache
 from pathlib import Path
 
 from .error import InstallError
 
-bits = 64 if ct.sizeof(ct.c_voidp) == 8 else 32
+if platform.system() == "Windows":
+    import winreg
 
-if platform.system() != "Windows":
-    raise InstallError("Only Windows OS supported")
+bits = 64 if ct.sizeof(ct.c_voidp) == 8 else 32
 
 
 VM_KEY = "VB:Voicemeeter {17359A74-1236-5467}"
@@ -26,6 +26,8 @@ REG_KEY = "\\".join(
     )
 )
 
+DLL_NAME = f'VoicemeeterRemote{"64" if bits == 64 else ""}.dll'
+
 
 def get_vmpath():
     with winreg.OpenKey(
@@ -34,15 +36,29 @@ def get_vmpath():
         return winreg.QueryValueEx(vm_key, r"UninstallString")[0]
 
 
-try:
-    vm_parent = Path(get_vmpath()).parent
-except FileNotFoundError as e:
-    raise InstallError("Unable to fetch DLL path from the registry") from e
+@cache
+def load_dll() -> ct.CDLL:
+    """
+    Locates the DLL through the registry and loads it.
 
-DLL_NAME = f'VoicemeeterRemote{"64" if bits == 64 else ""}.dll'
+    Loaded once, on first use.
+    """
+    if platform.system() != "Windows":
+        raise InstallError("Only Windows OS supported")
+
+    try:
+        vm_parent = Path(get_vmpath()).parent
+    except FileNotFoundError as e:
+        raise InstallError("Unable to fetch DLL path from the registry") from e
+
+    dll_path = vm_parent.joinpath(DLL_NAME)
+    if not dll_path.is_file():
+        raise InstallError(f"Could not find {dll_path}")
+
+    return ct.CDLL(str(dll_path))
 
-dll_path = vm_parent.joinpath(DLL_NAME)
-if not dll_path.is_file():
-    raise InstallError(f"Could not find {dll_path}")
 
-libc = ct.CDLL(str(dll_path))
+def __getattr__(name):
+    if name == "libc":
+        return load_dll()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,11 @@
 import logging
+import sys
 import time
 from abc import ABCMeta, abstractmethod
+from collections.abc import Sequence
+from typing import Callable
+
+from .cbindings import encode
 
 logger = logging.getLogger(__name__)
 
@@ -10,28 +15,49 @@ class IRemote(metaclass=ABCMeta):
     Common interface between base class and extended (higher) classes
 
     Provides some default implementation
+
+    Subclasses define __slots__, a logger is shared by all instances of a class.
     """
 
+    __slots__ = ("_remote", "index", "_cmds")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.logger = logger.getChild(cls.__name__)
+
     def __init__(self, remote, index=None):
         self._remote = remote
         self.index = index
-        self.logger = logger.getChild(self.__class__.__name__)
 
     def getter(self, param, **kwargs):
         """Gets a parameter value"""
-        self.logger.debug(f"getter: {self._cmd(param)}")
-        return self._remote.get(self._cmd(param), **kwargs)
+        cmd = self._cmd(param)
+        self.logger.debug("getter: %s", cmd)
+        return self._remote.get(cmd, **kwargs)
 
     def setter(self, param, val):
         """Sets a parameter value"""
-        self.logger.debug(f"setter: {self._cmd(param)}={val}")
-        self._remote.set(self._cmd(param), val)
+        cmd = self._cmd(param)
+        self.logger.debug("setter: %s=%s", cmd, val)
+        self._remote.set(cmd, val)
 
     def _cmd(self, param):
-        cmd = (self.identifier,)
-        if param:
-            cmd += (f".{param}",)
-        return "".join(cmd)
+        """
+        Returns the full parameter name, built once per object and param.
+
+        The identifier is only formatted on first use, the name is interned and its encoding cached.
+        """
+        try:
+            return self._cmds[param]
+        except AttributeError:
+            self._cmds = {}
+        except KeyError:
+            pass
+        cmd = self._cmds[param] = sys.intern(
+            f"{self.identifier}.{param}" if param else self.identifier
+        )
+        encode(cmd)
+        return cmd
 
     @abstractmethod
     def identifier(self):
@@ -56,4 +82,60 @@ class IRemote(metaclass=ABCMeta):
         return self
 
     def then_wait(self):
-        time.sleep(self._remote.DELAY)
+        if not self._remote.batching:
+            time.sleep(self._remote.DELAY)
+
+
+class IndexedView(Sequence):
+    """
+    Index-addressed view of a run of IRemote objects.
+
+    Each object is created on first access by calling make with its index, then reused,
+    so objects that are never accessed are never built.
+
+    Behaves like the tuple it replaces: slicing, concatenation and repetition return tuples,
+    and it compares equal to a tuple of the same objects.
+    """
+
+    __slots__ = ("_make", "_len", "_items")
+
+    def __init__(self, make: Callable[[int], IRemote], length: int):
+        self._make = make
+        self._len = length
+        self._items = [None] * length
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(self._len)))
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("index out of range")
+        if (item := self._items[i]) is None:
+            item = self._items[i] = self._make(i)
+        return item
+
+    def __add__(self, other) -> tuple:
+        return tuple(self) + tuple(other)
+
+    def __radd__(self, other) -> tuple:
+        return tuple(other) + tuple(self)
+
+    def __mul__(self, n: int) -> tuple:
+        return tuple(self) * n
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (IndexedView, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return repr(tuple(self))
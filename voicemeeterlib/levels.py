@@ -0,0 +1,139 @@
+from math import log10
+from typing import Iterable
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+FLOOR = -200.0
+
+
+def _convert_numpy(frame: Iterable) -> tuple:
+    arr = np.asarray(frame, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        db = np.round(20 * np.log10(arr), 1)
+    return tuple(np.where(arr > 0, db, FLOOR).tolist())
+
+
+def _convert_python(frame: Iterable) -> tuple:
+    return tuple(round(20 * log10(x), 1) if x > 0 else FLOOR for x in frame)
+
+
+def convert(frame: Iterable) -> tuple:
+    """
+    Converts a frame of raw level values to dB in a single call.
+
+    Uses NumPy if it is installed. Silent channels return -200.0
+    """
+    if np is not None:
+        return _convert_numpy(frame)
+    return _convert_python(frame)
+
+
+def _changed_numpy(old: Iterable, new: Iterable) -> int:
+    diff = np.not_equal(np.asarray(old), np.asarray(new))
+    return int.from_bytes(np.packbits(diff, bitorder="little").tobytes(), "little")
+
+
+def _changed_python(old: Iterable, new: Iterable) -> int:
+    bits = 0
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a != b:
+            bits |= 1 << i
+    return bits
+
+
+def changed(old: Iterable, new: Iterable) -> int:
+    """
+    Compares two raw frames in a single call.
+
+    Returns a bitmask of the channels that differ, bit i for channel i. Uses NumPy if it is installed.
+    """
+    if np is not None:
+        return _changed_numpy(old, new)
+    return _changed_python(old, new)
+
+
+class ChannelMap:
+    """
+    Level channel bitmasks for the strips or buses of a kind.
+
+    ranges[i] are the level channels of strip/bus i, masks[i] has a bit set for each of them
+    and owners[c] is the strip/bus of channel c.
+    """
+
+    __slots__ = ("ranges", "masks", "owners")
+
+    def __init__(self, level_map: tuple):
+        self.ranges = level_map
+        self.masks = tuple(((1 << (hi - lo)) - 1) << lo for lo, hi in level_map)
+        self.owners = tuple(
+            i for i, (lo, hi) in enumerate(level_map) for _ in range(lo, hi)
+        )
+
+    def dirty(self, bits: int) -> tuple:
+        """Returns the indices of the strips/buses with a channel set in bits, visiting only those"""
+        indices = []
+        while bits:
+            i = self.owners[(bits & -bits).bit_length() - 1]
+            indices.append(i)
+            bits &= ~self.masks[i]
+        return tuple(indices)
+
+
+def thresholds(threshold, mode: int, num_channels: int) -> tuple:
+    """
+    Returns a dB threshold per channel for a level mode.
+
+    threshold is a float for every channel, a sequence of one float per channel or a dict of either per level mode.
+    """
+    if isinstance(threshold, dict):
+        threshold = threshold.get(mode, 0.0)
+    if isinstance(threshold, (int, float)):
+        return (float(threshold),) * num_channels
+    if len(threshold) != num_channels:
+        raise ValueError(
+            f"Expected {num_channels} level thresholds for mode {mode}, got {len(threshold)}"
+        )
+    return tuple(float(x) for x in threshold)
+
+
+class Threshold:
+    """
+    Per channel dB thresholds for one level mode.
+
+    A channel has changed once its level moves by at least its threshold from the level last reported for it,
+    a threshold of 0 reports any change.
+    """
+
+    __slots__ = ("thresholds", "reference")
+
+    def __init__(self, thresholds: tuple):
+        self.thresholds = np.asarray(thresholds) if np is not None else thresholds
+        self.reference = None
+
+    def changed(self, frame_db: tuple) -> int:
+        """
+        Compares a dB frame against the reference, updating it for the channels that changed.
+
+        Returns a bitmask of those channels, every channel if there is no reference yet.
+        """
+        if self.reference is None:
+            self.reference = np.array(frame_db) if np is not None else list(frame_db)
+            return (1 << len(frame_db)) - 1
+        if np is not None:
+            new = np.asarray(frame_db)
+            delta = np.abs(new - self.reference)
+            diff = (delta > 0) & (delta >= self.thresholds)
+            self.reference[diff] = new[diff]
+            return int.from_bytes(
+                np.packbits(diff, bitorder="little").tobytes(), "little"
+            )
+        bits = 0
+        ref = self.reference
+        for i, (x, t) in enumerate(zip(frame_db, self.thresholds)):
+            if (delta := abs(x - ref[i])) > 0 and delta >= t:
+                ref[i] = x
+                bits |= 1 << i
+        return bits
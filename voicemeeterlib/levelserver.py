@@ -0,0 +1,468 @@
+import logging
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from array import array
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+from . import levels
+from .bus import bus_channel_maps
+from .error import VMError
+from .kinds import KindId
+from .kinds import request_kind_map as kindmap
+from .strip import strip_channel_maps
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VMLV"
+VERSION = 1
+DIRTY = 0x01
+
+# magic, version, kind id, num modes, flags, seq, timestamp
+HEADER = struct.Struct("<4sBBBBQd")
+MODE = struct.Struct("<BH")  # level mode, num channels
+BITS = struct.Struct("<HH")  # strip, bus dirty bitmask lengths in bytes
+LENGTH = struct.Struct("<I")  # frame length, stream transports only
+
+TRANSPORTS = ("tcp", "unix", "udp")
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    A level frame as published by a LevelServer.
+
+    levels maps each level mode to its raw channel values, dirty is (strip bits, bus bits) or None.
+    """
+
+    kind_id: int
+    seq: int
+    timestamp: float
+    levels: dict
+    dirty: Optional[tuple] = None
+
+
+def _floats(values) -> bytes:
+    arr = array("f", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def encode(frame: Frame) -> bytes:
+    """
+    Packs a frame, little-endian:
+
+    header: magic, version, kind id, number of level modes, flags, sequence number, timestamp
+    per level mode: mode, number of channels, float32 per channel
+    if flags & DIRTY: strip and bus bitmask lengths, then each bitmask
+    """
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            frame.kind_id,
+            len(frame.levels),
+            DIRTY if frame.dirty is not None else 0,
+            frame.seq,
+            frame.timestamp,
+        )
+    ]
+    for mode, values in frame.levels.items():
+        parts += [MODE.pack(mode, len(values)), _floats(values)]
+    if frame.dirty is not None:
+        masks = [
+            bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+            for bits in frame.dirty
+        ]
+        parts += [BITS.pack(*map(len, masks)), *masks]
+    return b"".join(parts)
+
+
+def decode(data: bytes) -> Frame:
+    """Unpacks a frame packed by encode()"""
+    magic, version, kind_id, num_modes, flags, seq, timestamp = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise VMError(f"Not a version {VERSION} level frame")
+    offset = HEADER.size
+    frames = {}
+    for _ in range(num_modes):
+        mode, num = MODE.unpack_from(data, offset)
+        offset += MODE.size
+        arr = array("f")
+        arr.frombytes(data[offset : offset + num * arr.itemsize])
+        if sys.byteorder == "big":
+            arr.byteswap()
+        frames[mode] = tuple(arr)
+        offset += num * arr.itemsize
+    dirty = None
+    if flags & DIRTY:
+        lens = BITS.unpack_from(data, offset)
+        offset += BITS.size
+        dirty = []
+        for n in lens:
+            dirty.append(int.from_bytes(data[offset : offset + n], "little"))
+            offset += n
+        dirty = tuple(dirty)
+    return Frame(kind_id, seq, timestamp, frames, dirty)
+
+
+def _check_transport(transport: str):
+    if transport not in TRANSPORTS:
+        raise ValueError(
+            f"Unknown transport '{transport}', expected one of {', '.join(TRANSPORTS)}"
+        )
+    if transport == "unix" and not hasattr(socket, "AF_UNIX"):
+        raise VMError(
+            "The unix transport is not available, this platform has no AF_UNIX"
+        )
+
+
+class StreamClient:
+    """
+    A TCP or UNIX socket client of a LevelServer.
+
+    Frames are sent from the client's own thread, only the latest unsent frame is kept:
+    a client that falls behind skips frames, one that stops reading for send_timeout is dropped.
+    """
+
+    def __init__(self, conn: socket.socket, send_timeout: float):
+        conn.settimeout(send_timeout)
+        self.conn = conn
+        self.alive = True
+        self.skipped = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self.logger = logger.getChild(self.__class__.__name__)
+        threading.Thread(target=self._run, name="levelclient", daemon=True).start()
+
+    def offer(self, data: bytes):
+        """Queues a frame without blocking, replacing any frame not yet sent"""
+        with self._cond:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = data
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self.alive:
+                    self._cond.wait()
+                if not self.alive:
+                    break
+                data, self._pending = self._pending, None
+            try:
+                self.conn.sendall(LENGTH.pack(len(data)) + data)
+            except OSError as e:
+                self.logger.debug(f"dropping level client: {e}")
+                break
+        self.close()
+
+    def close(self):
+        with self._cond:
+            self.alive = False
+            self._cond.notify()
+        self.conn.close()
+
+
+class LevelServer:
+    """
+    Publishes the level frames polled by a Remote's events thread.
+
+    A frame is published on each ldirty notification, with every subscribed level mode and the dirty bitmask.
+    Levels are polled once however many clients are connected.
+
+    address is (host, port) for tcp, a path for unix and (multicast group, port) for udp.
+    Stream clients receive the latest frame when they connect. Publishing never blocks the events thread,
+    frames a client can't keep up with are skipped.
+    """
+
+    def __init__(
+        self,
+        remote,
+        address: Union[tuple, str],
+        transport: str = "tcp",
+        send_timeout: float = 1.0,
+    ):
+        _check_transport(transport)
+        if not remote.event.ldirty:
+            raise VMError(
+                "Level server requires ldirty events, pass ldirty=True to api()"
+            )
+        self._remote = remote
+        self.transport = transport
+        self.send_timeout = send_timeout
+        self.seq = 0
+        self._latest = None
+        self._clients = []
+        self._lock = threading.Lock()
+        self.logger = logger.getChild(self.__class__.__name__)
+
+        if transport == "udp":
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            self._sock.setblocking(False)
+            self.address = address
+        else:
+            if transport == "tcp":
+                self._sock = socket.create_server(address)
+            else:
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.bind(address)
+                self._sock.listen()
+            self.address = self._sock.getsockname()
+            threading.Thread(
+                target=self._accept, name="levelserver", daemon=True
+            ).start()
+        self._remote.observer.add(self)
+        self.logger.info(f"publishing levels over {transport} at {self.address}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def clients(self) -> tuple:
+        """Connected stream clients"""
+        with self._lock:
+            return tuple(client for client in self._clients if client.alive)
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            client = StreamClient(conn, self.send_timeout)
+            with self._lock:
+                if self._latest is not None:
+                    client.offer(self._latest)
+                self._clients.append(client)
+
+    def on_update(self, event):
+        if event == "ldirty":
+            self.publish()
+
+    def publish(self):
+        """Publishes the cached level frames, called from the events thread"""
+        self.seq += 1
+        data = encode(
+            Frame(
+                KindId[self._remote.kind.name.upper()].value,
+                self.seq,
+                time.time(),
+                dict(self._remote.cache["levels"]),
+                self._remote._level_dirty,
+            )
+        )
+        if self.transport == "udp":
+            try:
+                self._sock.sendto(data, self.address)
+            except BlockingIOError:
+                self.logger.debug(f"send buffer full, frame {self.seq} dropped")
+            return
+        with self._lock:
+            self._latest = data
+            self._clients = [client for client in self._clients if client.alive]
+            for client in self._clients:
+                client.offer(data)
+
+    def close(self):
+        self._remote.observer.remove(self)
+        self._sock.close()
+        if self.transport == "unix":
+            with suppress(FileNotFoundError):
+                os.unlink(self.address)
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+
+
+class StripLevelView:
+    """Strip levels of the latest frame received by a LevelClient, as StripLevel"""
+
+    __slots__ = ("_client", "index", "range", "_mask")
+
+    def __init__(self, client, index: int, kind_name: str):
+        self._client = client
+        self.index = index
+        channel_map = strip_channel_maps[kind_name]
+        self.range = channel_map.ranges[index]
+        self._mask = channel_map.masks[index]
+
+    @property
+    def prefader(self) -> tuple:
+        return self._client._get(0, self.range)
+
+    @property
+    def postfader(self) -> tuple:
+        return self._client._get(1, self.range)
+
+    @property
+    def postmute(self) -> tuple:
+        return self._client._get(2, self.range)
+
+    @property
+    def isdirty(self) -> bool:
+        """Returns True if the latest frame changed this strip's levels"""
+        return bool(self._client._dirty(0) & self._mask)
+
+
+class BusLevelView:
+    """Bus levels of the latest frame received by a LevelClient, as BusLevel"""
+
+    __slots__ = ("_client", "index", "range", "_mask")
+
+    def __init__(self, client, index: int, kind_name: str):
+        self._client = client
+        self.index = index
+        channel_map = bus_channel_maps[kind_name]
+        self.range = channel_map.ranges[index]
+        self._mask = channel_map.masks[index]
+
+    @property
+    def all(self) -> tuple:
+        return self._client._get(3, self.range)
+
+    @property
+    def isdirty(self) -> bool:
+        """Returns True if the latest frame changed this bus's levels"""
+        return bool(self._client._dirty(1) & self._mask)
+
+
+class FrameViews:
+    """
+    StripLevel and BusLevel like views of self.frame.
+
+    Each level mode is converted to dB once per frame, on first access.
+    """
+
+    def __init__(self):
+        self._frame = None
+        self._db = {}
+        self._views = None
+
+    @property
+    def frame(self) -> Optional[Frame]:
+        """The latest frame"""
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame: Frame):
+        self._frame = frame
+        self._db = {}
+
+    def _get(self, mode: int, range_: tuple) -> tuple:
+        if self.frame is None:
+            raise VMError("No level frame read yet")
+        try:
+            frame_db = self._db[mode]
+        except KeyError:
+            if (frame := self.frame.levels.get(mode)) is None:
+                raise VMError(f"Level mode {mode} is not published")
+            frame_db = self._db[mode] = levels.convert(frame)
+        return frame_db[range_[0] : range_[-1]]
+
+    def _dirty(self, i: int) -> int:
+        if self.frame is None or self.frame.dirty is None:
+            return 0
+        return self.frame.dirty[i]
+
+    def _make_views(self) -> tuple:
+        if self.frame is None:
+            raise VMError("No level frame read yet")
+        if self._views is None or self._views[0] != self.frame.kind_id:
+            kind = kindmap(KindId(self.frame.kind_id).name.lower())
+            self._views = (
+                self.frame.kind_id,
+                tuple(
+                    StripLevelView(self, i, kind.name) for i in range(kind.num_strip)
+                ),
+                tuple(BusLevelView(self, i, kind.name) for i in range(kind.num_bus)),
+            )
+        return self._views
+
+    @property
+    def strip(self) -> tuple:
+        return self._make_views()[1]
+
+    @property
+    def bus(self) -> tuple:
+        return self._make_views()[2]
+
+
+class LevelClient(FrameViews):
+    """
+    Receives level frames from a LevelServer.
+
+    strip[i] and bus[i] give StripLevel and BusLevel like views of the latest frame received.
+    """
+
+    def __init__(
+        self,
+        address: Union[tuple, str],
+        transport: str = "tcp",
+        timeout: Optional[float] = None,
+    ):
+        _check_transport(transport)
+        self.transport = transport
+        super().__init__()
+        self.logger = logger.getChild(self.__class__.__name__)
+
+        if transport == "udp":
+            group, port = address
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.bind(("", port))
+            self._sock.setsockopt(
+                socket.IPPROTO_IP,
+                socket.IP_ADD_MEMBERSHIP,
+                socket.inet_aton(group) + socket.inet_aton("0.0.0.0"),
+            )
+        elif transport == "tcp":
+            self._sock = socket.create_connection(address)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(address)
+        self._sock.settimeout(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self) -> Iterator[Frame]:
+        while True:
+            yield self.recv()
+
+    def _recv_exactly(self, n: int) -> bytes:
+        buf = bytearray(n)
+        view = memoryview(buf)
+        while view:
+            if not (read := self._sock.recv_into(view)):
+                raise ConnectionError("level server closed the connection")
+            view = view[read:]
+        return bytes(buf)
+
+    def recv(self) -> Frame:
+        """Blocks until the next frame is received, returns it"""
+        if self.transport == "udp":
+            data = self._sock.recv(65535)
+        else:
+            (length,) = LENGTH.unpack(self._recv_exactly(LENGTH.size))
+            data = self._recv_exactly(length)
+        self.frame = decode(data)
+        return self.frame
+
+    def close(self):
+        self._sock.close()
@@ -0,0 +1,232 @@
+import logging
+import struct
+import threading
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+from .error import VMError
+from .kinds import KindId
+from .kinds import request_kind_map as kindmap
+from .levelserver import Frame, FrameViews
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VMLS"
+VERSION = 1
+
+# magic, version, kind id, level modes present, seq, timestamp
+HEADER = struct.Struct("=4sBBBxQd")
+SEQ = struct.Struct("=Q")
+SEQ_OFFSET = 8
+
+_published = set()
+
+
+def layout(kind) -> tuple:
+    """
+    Returns ({mode: (offset, num channels)}, dirty bitmask offsets, size) for a kind.
+
+    Float32 channels for level modes 0-2 (strip) and 3 (bus) follow the header,
+    then the strip and bus dirty bitmasks.
+    """
+    offset, modes = HEADER.size, {}
+    for mode in range(4):
+        num = kind.num_bus_levels if mode == 3 else kind.num_strip_levels
+        modes[mode] = (offset, num)
+        offset += num * 4
+    strip_bytes = (kind.num_strip_levels + 7) // 8
+    bus_bytes = (kind.num_bus_levels + 7) // 8
+    dirty = ((offset, strip_bytes), (offset + strip_bytes, bus_bytes))
+    return modes, dirty, offset + strip_bytes + bus_bytes
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to an existing segment without leaving it registered with this process's resource tracker.
+
+    The publisher owns the segment, it must not be unlinked when a reader exits (bpo-39959).
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name)
+    # a publisher in this process shares the tracker entry, it unregisters on unlink
+    if shm.name not in _published:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class LevelPublisher:
+    """
+    Writes the level frames polled by a Remote's events thread into shared memory.
+
+    A frame is written on each ldirty notification, guarded by a sequence lock:
+    the sequence number is odd while a frame is being written, readers retry until they copy an even, unchanged one.
+
+    The segment is unlinked on close(), which waits for a frame being written to complete.
+    """
+
+    def __init__(self, remote, name: Optional[str] = None):
+        if not remote.event.ldirty:
+            raise VMError(
+                "Level publisher requires ldirty events, pass ldirty=True to api()"
+            )
+        self._remote = remote
+        self._modes, self._bitmasks, size = layout(remote.kind)
+        self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self._shm.name
+        _published.add(self.name)
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._levels = self._shm.buf[HEADER.size : self._bitmasks[0][0]]
+        self._floats = self._levels.cast("f")
+        HEADER.pack_into(
+            self._shm.buf,
+            0,
+            MAGIC,
+            VERSION,
+            KindId[remote.kind.name.upper()].value,
+            0,
+            self.seq,
+            0.0,
+        )
+        self.logger = logger.getChild(self.__class__.__name__)
+        self._remote.observer.add(self)
+        self.logger.info(f"publishing levels to shared memory {self.name}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def on_update(self, event):
+        if event == "ldirty":
+            self.publish()
+
+    def publish(self):
+        """Writes the cached level frames, called from the events thread"""
+        with self._lock:
+            if not self._closed:
+                self._publish()
+
+    def _publish(self):
+        buf, frames = self._shm.buf, self._remote.cache["levels"]
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq + 1)
+        present = 0
+        for mode, frame in frames.items():
+            offset, num = self._modes[mode]
+            start = (offset - HEADER.size) // 4
+            self._floats[start : start + num] = array("f", frame)
+            present |= 1 << mode
+        for (offset, num), bits in zip(self._bitmasks, self._remote._level_dirty):
+            buf[offset : offset + num] = bits.to_bytes(num, "little")
+        buf[6] = present
+        struct.pack_into("=d", buf, SEQ_OFFSET + SEQ.size, time.time())
+        self.seq += 2
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+
+    def close(self):
+        if self in self._remote.observer.observers:
+            self._remote.observer.remove(self)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._floats.release()
+        self._levels.release()
+        self._shm.close()
+        self._shm.unlink()
+        _published.discard(self.name)
+
+
+class LevelReader(FrameViews):
+    """
+    Maps the shared memory written by a LevelPublisher.
+
+    seq is read straight from the segment, poll it to find out if a new frame has been written.
+    read() copies the latest frame, then strip[i] and bus[i] give StripLevel and BusLevel like views of it.
+
+    views maps each level mode to float32 channels read in place from the segment.
+    They are only consistent between begin() and a validate() that returns True.
+    """
+
+    def __init__(self, name: str):
+        super().__init__()
+        self._shm = _attach(name)
+        magic, version, kind_id, *_ = HEADER.unpack_from(self._shm.buf)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise VMError(f"{name} is not a version {VERSION} level segment")
+        self.kind_id = kind_id
+        self._modes, self._bitmasks, self._size = layout(
+            kindmap(KindId(kind_id).name.lower())
+        )
+        self._data = bytearray(self._size)
+        self.views = {
+            mode: self._shm.buf[offset : offset + num * 4].cast("f")
+            for mode, (offset, num) in self._modes.items()
+        }
+        self.logger = logger.getChild(self.__class__.__name__)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest frame, odd while one is being written"""
+        return SEQ.unpack_from(self._shm.buf, SEQ_OFFSET)[0]
+
+    def begin(self, retries: int = 1000) -> int:
+        """Waits until no frame is being written, returns the sequence number to validate against"""
+        for _ in range(retries):
+            if not (seq := self.seq) & 1:
+                return seq
+            time.sleep(0)
+        raise VMError(f"No complete level frame read after {retries} attempts")
+
+    def validate(self, seq: int) -> bool:
+        """True if no frame has been written since begin() returned seq"""
+        return self.seq == seq
+
+    def read(self, retries: int = 1000) -> Frame:
+        """
+        Copies the latest complete frame, retrying while the publisher writes.
+
+        The copy is what the sequence lock validates, a frame kept past the next publish must be copied.
+        """
+        buf = self._shm.buf
+        for _ in range(retries):
+            if not (seq := self.seq) & 1:
+                self._data[:] = buf[: self._size]
+                if self.validate(seq):
+                    self.frame = self._decode(self._data)
+                    return self.frame
+            time.sleep(0)
+        raise VMError(f"No complete level frame read after {retries} attempts")
+
+    def _decode(self, data: bytearray) -> Frame:
+        _, _, kind_id, present, seq, timestamp = HEADER.unpack_from(data)
+        frames = {}
+        for mode, (offset, num) in self._modes.items():
+            if present >> mode & 1:
+                frames[mode] = tuple(
+                    memoryview(data)[offset : offset + num * 4].cast("f")
+                )
+        dirty = tuple(
+            int.from_bytes(data[offset : offset + num], "little")
+            for offset, num in self._bitmasks
+        )
+        return Frame(kind_id, seq, timestamp, frames, dirty)
+
+    def close(self):
+        for view in self.views.values():
+            view.release()
+        self._shm.close()
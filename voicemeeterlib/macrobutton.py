@@ -12,6 +12,8 @@ ButtonModes = IntEnum(
 class Adapter(IRemote):
     """Adapter to the common interface."""
 
+    __slots__ = ()
+
     def identifier(self):
         pass
 
@@ -29,6 +31,8 @@ class Adapter(IRemote):
 class MacroButton(Adapter):
     """Defines concrete implementation for macrobutton"""
 
+    __slots__ = ()
+
     def __str__(self):
         return f"{type(self).__name__}{self._remote.kind}{self.index}"
 
@@ -39,6 +39,11 @@ def bus_mode_prop(param):
         return self.getter(param) == 1
 
     def fset(self, val: bool):
+        if val:  # modes are exclusive, values cached for the others are stale
+            prefix = f"{self._cmd('')}."
+            cache = self._remote.cache
+            for key in [key for key in cache if key.startswith(prefix)]:
+                del cache[key]
         self.setter(param, 1 if val else 0)
 
     return property(fget, fset)
@@ -51,3 +56,45 @@ def device_prop(param):
         self.setter(param, val)
 
     return property(fset=fset)
+
+
+def ranged(prop, param):
+    """
+    meta function, warns when the setter of a property is given a number outside the param's range
+
+    Any other value is left to the setter to validate.
+    """
+    lo, hi = param.range
+
+    def fset(self, val):
+        if isinstance(val, (int, float)) and not lo <= val <= hi:
+            self.logger.warning(
+                f"{param.name} got: {val} but expected a value from {lo} to {hi}"
+            )
+        prop.fset(self, val)
+
+    return property(prop.fget, fset)
+
+
+def schema_props(section, base) -> dict:
+    """
+    meta function for a schema section
+
+    Returns a property for each parameter not already defined on base.
+    Setters of parameters with a range, generated or defined on base, are range checked.
+    """
+    props = {}
+    for param in section:
+        if hasattr(base, param.name):
+            prop = getattr(base, param.name)
+        elif param.access == "w":
+            prop = props[param.name] = device_prop(param.param)
+        elif param.sync:
+            prop = props[param.name] = bus_mode_prop(param.param)
+        elif param.type is bool:
+            prop = props[param.name] = bool_prop(param.param)
+        else:
+            prop = props[param.name] = float_prop(param.param)
+        if param.range and isinstance(prop, property) and prop.fset:
+            props[param.name] = ranged(prop, param)
+    return props
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .error import CAPIError
+
+logger = logging.getLogger(__name__)
+
+
+class Stat:
+    """Call count, cumulative latency, latency histogram and error codes for one function"""
+
+    __slots__ = ("count", "total", "buckets", "errors")
+
+    def __init__(self, num_buckets: int):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * num_buckets
+        self.errors = Counter()
+
+
+class Metrics:
+    """
+    Counts calls made through CBindings.call, per VBVMR function.
+
+    Latencies are in seconds, BUCKETS are the upper bounds of the histogram.
+    """
+
+    BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.1, 1.0)
+
+    def __init__(self, call):
+        self._call = call
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.closed = False
+        self.logger = logger.getChild(self.__class__.__name__)
+
+    def call(self, func, *args, **kwargs):
+        if self.closed:
+            return self._call(func, *args, **kwargs)
+        start = time.perf_counter()
+        code = None
+        try:
+            return self._call(func, *args, **kwargs)
+        except CAPIError as e:
+            code = e.code
+            raise
+        finally:
+            self._record(func.__name__, time.perf_counter() - start, code)
+
+    def _record(self, name: str, latency: float, code):
+        with self._lock:
+            try:
+                stat = self.stats[name]
+            except KeyError:
+                stat = self.stats[name] = Stat(len(self.BUCKETS) + 1)
+            stat.count += 1
+            stat.total += latency
+            stat.buckets[bisect_left(self.BUCKETS, latency)] += 1
+            if code is not None:
+                stat.errors[code] += 1
+
+    def close(self):
+        """Stops counting, calls still made through Metrics are passed through"""
+        self.closed = True
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Returns {function name: metrics}.
+
+        histogram maps each upper bound to the number of calls at or under it, cumulatively.
+        """
+        with self._lock:
+            snapshot = {}
+            for name, stat in self.stats.items():
+                cumulative, histogram = 0, {}
+                for le, n in zip((*self.BUCKETS, float("inf")), stat.buckets):
+                    cumulative += n
+                    histogram[le] = cumulative
+                snapshot[name] = {
+                    "count": stat.count,
+                    "total": stat.total,
+                    "histogram": histogram,
+                    "errors": dict(stat.errors),
+                }
+            return snapshot
+
+
+def prometheus(snapshot: dict) -> str:
+    """Formats a metrics snapshot in the Prometheus text exposition format"""
+    lines = [
+        "# HELP voicemeeter_call_duration_seconds Latency of calls to the Voicemeeter Remote API.",
+        "# TYPE voicemeeter_call_duration_seconds histogram",
+    ]
+    for name, m in snapshot.items():
+        for le, n in m["histogram"].items():
+            le = "+Inf" if le == float("inf") else repr(le)
+            lines.append(
+                f'voicemeeter_call_duration_seconds_bucket{{fn="{name}",le="{le}"}} {n}'
+            )
+        lines.append(
+            f'voicemeeter_call_duration_seconds_sum{{fn="{name}"}} {m["total"]}'
+        )
+        lines.append(
+            f'voicemeeter_call_duration_seconds_count{{fn="{name}"}} {m["count"]}'
+        )
+    lines += [
+        "# HELP voicemeeter_call_errors_total Error codes returned by the Voicemeeter Remote API.",
+        "# TYPE voicemeeter_call_errors_total counter",
+    ]
+    for name, m in snapshot.items():
+        for code, n in m["errors"].items():
+            lines.append(
+                f'voicemeeter_call_errors_total{{fn="{name}",code="{code}"}} {n}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+def start_http_server(remote, port: int = 9101, addr: str = "") -> ThreadingHTTPServer:
+    """
+    Serves {Remote}.metrics() in the Prometheus text format at /metrics, from a daemon thread.
+
+    Call shutdown() on the returned server to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus(remote.metrics()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"serving metrics on port {server.server_port}")
+    return server
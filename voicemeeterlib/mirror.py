@@ -0,0 +1,165 @@
+import ctypes as ct
+import logging
+import time
+from typing import Iterator, Optional, Union
+
+from .error import CAPIError
+from .schema import request_schema
+
+logger = logging.getLogger(__name__)
+
+
+VBAN_FIELDS = ("on", "name", "ip", "port", "sr", "channel", "bit", "quality", "route")
+
+
+def _ranges(kind) -> dict:
+    """Indices each schema section applies to"""
+    phys_in, phys_out = range(kind.phys_in), range(kind.phys_out)
+    return {
+        "PhysicalStrip": phys_in,
+        "VirtualStrip": range(kind.phys_in, kind.num_strip),
+        "StripComp": phys_in,
+        "StripGate": phys_in,
+        "StripDenoiser": phys_in,
+        "StripEQ": phys_in,
+        "StripDevice": phys_in,
+        "PhysicalBus": phys_out,
+        "VirtualBus": range(kind.phys_out, kind.num_bus),
+        "BusEQ": range(kind.num_bus),
+        "BusMode": range(kind.num_bus),
+        "BusDevice": range(kind.num_bus) if kind.name == "basic" else phys_out,
+        "GainLayer": range(kind.num_strip),
+    }
+
+
+def readable(kind) -> Iterator[tuple]:
+    """
+    Generator function, yields (param, is_string) for every readable parameter of a kind.
+
+    Strip and bus parameters come from the schema, the rest are listed here.
+    """
+    ranges = _ranges(kind)
+    for name, section in request_schema(kind.name).items():
+        for i in ranges[name]:
+            identifier = section.identifier.format(index=i)
+            for p in section:
+                if "r" in p.access:
+                    param = f"{identifier}.{p.param}" if p.param else identifier
+                    yield param, p.type is str
+
+    num_in, num_out, num_midi, num_text = kind.vban
+    for direction, num in (
+        ("instream", num_in + num_midi + num_text),
+        ("outstream", num_out + num_midi),
+    ):
+        for i in range(num):
+            for field in VBAN_FIELDS:
+                yield f"vban.{direction}[{i}].{field}", field in ("name", "ip")
+
+    yield from ((f"option.{p}", False) for p in ("sr", "asiosr", "monitoronsel"))
+    yield from ((f"option.delay[{i}]", False) for i in range(kind.phys_out))
+
+    if kind.name == "basic":
+        return
+    for param in (
+        *(f"A{i}" for i in range(1, kind.phys_out + 1)),
+        *(f"B{i}" for i in range(1, kind.virt_out + 1)),
+        "bitresolution",
+        "channel",
+        "gain",
+        "kbps",
+        "samplerate",
+        *(f"mode.{m}" for m in ("loop", "multitrack", "playonload", "recbus")),
+    ):
+        yield f"recorder.{param}", False
+    yield from ((f"patch.asio[{i}]", False) for i in range(kind.asio[0]))
+    for i in range(2, 6):
+        yield from ((f"patch.outA{i}[{j}]", False) for j in range(kind.asio[1]))
+    yield from ((f"patch.composite[{i}]", False) for i in range(kind.composite))
+    yield from ((f"patch.insert[{i}]", False) for i in range(kind.insert))
+    yield from ((f"patch.{p}", False) for p in ("postfadercomposite", "postfxinsert"))
+
+    if kind.name == "potato":
+        for fx in ("reverb", "delay"):
+            yield from ((f"FX.{fx}.{p}", False) for p in ("On", "ab"))
+
+
+class StateMirror:
+    """
+    Holds the value of every readable parameter for a kind in memory.
+
+    Values are refreshed in bulk when parameters are dirty, writes are mirrored as they are made.
+    """
+
+    def __init__(self, remote, params: Optional[dict] = None):
+        self._remote = remote
+        self.logger = logger.getChild(self.__class__.__name__)
+        self.params = dict(readable(remote.kind)) if params is None else params
+        encoded = {
+            param.lower(): (param.encode(), is_string)
+            for param, is_string in self.params.items()
+        }
+        self._encoded = tuple((k, *v) for k, v in encoded.items())
+        self.values = {}
+        self.stale = True
+        self._last = 0
+        self.logger.debug(f"mirroring {len(self.params)} parameters")
+
+    def refresh(self):
+        """
+        Reads every parameter in a single pass, reusing one buffer per type.
+
+        A parameter the API fails to read is logged and no longer mirrored.
+        """
+        remote = self._remote
+        self.stale = False
+        fbuf = ct.c_float()
+        sbuf = ct.create_unicode_buffer(512)
+        failed = []
+        for entry in self._encoded:
+            key, param, is_string = entry
+            try:
+                if is_string:
+                    remote.call(
+                        remote.bind_get_parameter_string_w, param, ct.byref(sbuf)
+                    )
+                    self.values[key] = sbuf.value
+                else:
+                    remote.call(remote.bind_get_parameter_float, param, ct.byref(fbuf))
+                    self.values[key] = fbuf.value
+            except CAPIError as e:
+                self.logger.warning(f"dropping {param.decode()} from the mirror: {e}")
+                failed.append(entry)
+        if failed:
+            self._encoded = tuple(e for e in self._encoded if e not in failed)
+            for _, param, _ in failed:
+                self.params.pop(param.decode(), None)
+        self._last = time.monotonic()
+
+    def _poll(self):
+        """
+        Refreshes if the mirror is stale, checking pdirty at most once per ratelimit.
+
+        The mirror is marked stale by any read of pdirty that finds it set, including
+        those made by the events thread and clear_dirty(). If the events thread is listening
+        for pdirty the check is left to it.
+        """
+        remote = self._remote
+        if (remote.stopped() or not remote.event.pdirty) and (
+            time.monotonic() - self._last >= remote.ratelimit
+        ):
+            self._last = time.monotonic()
+            remote.pdirty  # marks the mirror stale if set
+        if self.stale:
+            self.refresh()
+
+    def get(self, param: str) -> Optional[Union[str, float]]:
+        """Returns the mirrored value of a parameter, None if it isn't mirrored"""
+        self._poll()
+        return self.values.get(param.lower())
+
+    def update(self, param: str, val: Union[str, float]):
+        """Mirrors a write"""
+        key = param.lower()
+        if key in self.values:
+            self.values[key] = val if isinstance(val, str) else float(val)
@@ -1,10 +1,12 @@
+from functools import partial
 from typing import Optional
 
-from .iremote import IRemote
-from .kinds import kinds_all
+from .iremote import IndexedView, IRemote
 
 
 class FX(IRemote):
+    __slots__ = ()
+
     def __str__(self):
         return f"{type(self).__name__}"
 
@@ -46,27 +48,32 @@ class FX(IRemote):
 
 
 class Patch(IRemote):
+    __slots__ = ("asio", "A2", "A3", "A4", "A5", "composite", "insert")
+
     @classmethod
     def make(cls, remote):
         """
         Factory method for Patch.
 
-        Mixes in required classes.
-
-        Returns a Patch class of a kind.
+        Returns a Patch of a kind.
         """
-        ASIO_cls = _make_asio_mixins(remote)[remote.kind.name]
-        return type(
-            f"Patch{remote.kind}",
-            (cls, ASIO_cls),
-            {
-                "composite": tuple(Composite(remote, i) for i in range(8)),
-                "insert": tuple(Insert(remote, i) for i in range(remote.kind.insert)),
-            },
-        )(remote)
+        return cls(remote)
+
+    def __init__(self, remote):
+        super().__init__(remote)
+        asio_in, asio_out = remote.kind.asio
+        self.asio = IndexedView(partial(AsioIn, remote), asio_in)
+        for param in ("A2", "A3", "A4", "A5"):
+            setattr(
+                self,
+                param,
+                IndexedView(partial(AsioOut, remote, param=param), asio_out),
+            )
+        self.composite = IndexedView(partial(Composite, remote), 8)
+        self.insert = IndexedView(partial(Insert, remote), remote.kind.insert)
 
     def __str__(self):
-        return f"{type(self).__name__}"
+        return f"{type(self).__name__}{self._remote.kind}"
 
     @property
     def identifier(self) -> str:
@@ -80,6 +87,8 @@ class Patch(IRemote):
     def postfadercomp(self, val: bool):
         self.setter("postfadercomposite", 1 if val else 0)
 
+    postfadercomposite = postfadercomp
+
     @property
     def postfxinsert(self) -> bool:
         return self.getter("postfxinsert") == 1
@@ -90,12 +99,16 @@ class Patch(IRemote):
 
 
 class Asio(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return "patch"
 
 
 class AsioIn(Asio):
+    __slots__ = ()
+
     def get(self) -> int:
         return int(self.getter(f"asio[{self.index}]"))
 
@@ -104,6 +117,8 @@ class AsioIn(Asio):
 
 
 class AsioOut(Asio):
+    __slots__ = ("_param",)
+
     def __init__(self, remote, i, param):
         IRemote.__init__(self, remote, i)
         self._param = param
@@ -115,28 +130,9 @@ class AsioOut(Asio):
         self.setter(f"out{self._param}[{self.index}]", val)
 
 
-def _make_asio_mixin(remote, kind):
-    """Creates an ASIO mixin for a kind"""
-    asio_in, asio_out = kind.asio
-
-    return type(
-        f"ASIO{kind}",
-        (IRemote,),
-        {
-            "asio": tuple(AsioIn(remote, i) for i in range(asio_in)),
-            **{
-                param: tuple(AsioOut(remote, i, param) for i in range(asio_out))
-                for param in ["A2", "A3", "A4", "A5"]
-            },
-        },
-    )
-
-
-def _make_asio_mixins(remote):
-    return {kind.name: _make_asio_mixin(remote, kind) for kind in kinds_all}
-
-
 class Composite(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return "patch"
@@ -149,6 +145,8 @@ class Composite(IRemote):
 
 
 class Insert(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return "patch"
@@ -163,25 +161,23 @@ class Insert(IRemote):
 
 
 class Option(IRemote):
+    __slots__ = ("delay",)
+
     @classmethod
     def make(cls, remote):
         """
         Factory method for Option.
 
-        Mixes in required classes.
-
-        Returns a Option class of a kind.
+        Returns a Option of a kind.
         """
-        return type(
-            f"Option{remote.kind}",
-            (cls,),
-            {
-                "delay": tuple(Delay(remote, i) for i in range(remote.kind.phys_out)),
-            },
-        )(remote)
+        return cls(remote)
+
+    def __init__(self, remote):
+        super().__init__(remote)
+        self.delay = IndexedView(partial(Delay, remote), remote.kind.phys_out)
 
     def __str__(self):
-        return f"{type(self).__name__}"
+        return f"{type(self).__name__}{self._remote.kind}"
 
     @property
     def identifier(self) -> str:
@@ -219,6 +215,8 @@ class Option(IRemote):
 
 
 class Delay(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return "option"
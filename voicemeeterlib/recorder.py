@@ -1,7 +1,8 @@
 import re
+from functools import cache, partial
 
 from .error import VMError
-from .iremote import IRemote
+from .iremote import IndexedView, IRemote
 from .kinds import kinds_all
 from .meta import action_fn, bool_prop
 
@@ -13,19 +14,26 @@ class Recorder(IRemote):
     Defines concrete implementation for recorder
     """
 
+    __slots__ = ("mode", "armstrip", "armbus")
+
     @classmethod
     def make(cls, remote):
         """
         Factory function for recorder.
 
-        Returns a Recorder class of a kind.
+        Returns a Recorder of a kind, its class is generated once per kind.
         """
-        CHANNELOUTMIXIN_cls = _make_channelout_mixins[remote.kind.name]
-        ARMCHANNELMIXIN_cls = _make_armchannel_mixins(remote)[remote.kind.name]
-        REC_cls = type(
-            f"Recorder{remote.kind}",
-            (cls, CHANNELOUTMIXIN_cls, ARMCHANNELMIXIN_cls),
+        return cls._make_cls(remote.kind.name)(remote)
+
+    @classmethod
+    @cache
+    def _make_cls(cls, kind_id: str):
+        CHANNELOUTMIXIN_cls = _make_channelout_mixins[kind_id]
+        return type(
+            f"Recorder{kind_id.capitalize()}",
+            (cls, CHANNELOUTMIXIN_cls),
             {
+                "__slots__": (),
                 **{
                     param: action_fn(param)
                     for param in [
@@ -38,10 +46,16 @@ class Recorder(IRemote):
                         "rew",
                     ]
                 },
-                "mode": RecorderMode(remote),
             },
         )
-        return REC_cls(remote)
+
+    def __init__(self, remote):
+        super().__init__(remote)
+        self.mode = RecorderMode(remote)
+        self.armstrip = IndexedView(
+            partial(RecorderArmStrip, remote), remote.kind.num_strip
+        )
+        self.armbus = IndexedView(partial(RecorderArmBus, remote), remote.kind.num_bus)
 
     def __str__(self):
         return f"{type(self).__name__}"
@@ -149,6 +163,8 @@ class Recorder(IRemote):
 
 
 class RecorderMode(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self):
         return "recorder.mode"
@@ -187,6 +203,8 @@ class RecorderMode(IRemote):
 
 
 class RecorderArmChannel(IRemote):
+    __slots__ = ("_i",)
+
     def __init__(self, remote, i):
         super().__init__(remote)
         self._i = i
@@ -196,41 +214,28 @@ class RecorderArmChannel(IRemote):
 
 
 class RecorderArmStrip(RecorderArmChannel):
+    __slots__ = ()
+
     @property
     def identifier(self):
         return f"recorder.armstrip[{self._i}]"
 
 
 class RecorderArmBus(RecorderArmChannel):
+    __slots__ = ()
+
     @property
     def identifier(self):
         return f"recorder.armbus[{self._i}]"
 
 
-def _make_armchannel_mixin(remote, kind):
-    """Creates an armchannel out mixin"""
-    return type(
-        f"ArmChannelMixin{kind}",
-        (),
-        {
-            "armstrip": tuple(
-                RecorderArmStrip(remote, i) for i in range(kind.num_strip)
-            ),
-            "armbus": tuple(RecorderArmBus(remote, i) for i in range(kind.num_bus)),
-        },
-    )
-
-
-def _make_armchannel_mixins(remote):
-    return {kind.name: _make_armchannel_mixin(remote, kind) for kind in kinds_all}
-
-
 def _make_channelout_mixin(kind):
     """Creates a channel out mixin"""
     return type(
         f"ChannelOutMixin{kind}",
         (),
         {
+            "__slots__": (),
             **{f"A{i}": bool_prop(f"A{i}") for i in range(1, kind.phys_out + 1)},
             **{f"B{i}": bool_prop(f"B{i}") for i in range(1, kind.virt_out + 1)},
         },
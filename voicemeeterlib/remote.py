@@ -1,20 +1,37 @@
 import ctypes as ct
 import logging
+import operator
 import threading
 import time
 from abc import abstractmethod
-from queue import Queue
-from typing import Iterable, Optional, Union
-
-from .cbindings import CBindings
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+from .bus import bus_channel_maps
+from .cbindings import (
+    OK_DIRTY,
+    OK_NO_MIDI,
+    Buffers,
+    CBindings,
+    encode,
+    non_negative,
+    request_backend,
+)
 from .error import CAPIError, VMError
 from .event import Event
+from .history import LevelHistory
 from .inst import bits
 from .kinds import KindId
+from .levels import thresholds
+from .metrics import Metrics
+from .mirror import StateMirror
 from .misc import Midi, VmGui
+from .schema import is_call, write_only
+from .strip import strip_channel_maps
 from .subject import Subject
-from .updater import Producer, Updater
-from .util import deep_merge, grouper, polling, script, timeout
+from .trace import Tracer
+from .updater import Updater
+from .util import deep_merge, grouper, polling, script, script_chunks, timeout
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +42,33 @@ class Remote(CBindings):
     DELAY = 0.001
 
     def __init__(self, **kwargs):
-        self.strip_mode = 0
         self.cache = {}
+        self._batch_local = threading.local()
+        self._buffers = threading.local()
+        self._compiled_configs = {}
+        self._level_mask = 0b1001  # strip prefader, bus
+        self._level_dirty = (0, 0)
+        self.mirror = None
         self.midi = Midi()
         self.subject = self.observer = Subject()
-        self.event = Event(
-            {k: kwargs.pop(k) for k in ("pdirty", "mdirty", "midi", "ldirty")}
-        )
+        subs = {k: kwargs.pop(k) for k in ("pdirty", "mdirty", "midi", "ldirty")}
+        rates = kwargs.pop("rates")
+        if unknown := set(rates) - set(subs):
+            raise ValueError(f"Unknown event type(s) in rates: {', '.join(unknown)}")
+        self.event = Event(subs, {k: rates.get(k, kwargs["ratelimit"]) for k in subs})
+        self.backend = request_backend(kwargs.pop("backend"), self.kind.name)
+        self.bind(self.backend)
+        self._metrics = None
+        size, hold = kwargs.pop("history"), kwargs.pop("peak_hold")
+        self.history = LevelHistory(size, hold) if size else None
+        self.level_thresholds = {}
+        level_threshold = kwargs.pop("level_threshold")
+        for mode in range(4):
+            num = self.kind.num_bus_levels if mode == 3 else self.kind.num_strip_levels
+            if any(dbs := thresholds(level_threshold, mode, num)):
+                self.level_thresholds[mode] = dbs
+        if kwargs.pop("metrics"):
+            self.enable_metrics()
         self.gui = VmGui()
         self.stop_event = None
         self.logger = logger.getChild(self.__class__.__name__)
@@ -58,11 +95,8 @@ class Remote(CBindings):
         self.logger.debug("initiating events thread")
         self.stop_event = threading.Event()
         self.stop_event.clear()
-        queue = Queue()
-        self.updater = Updater(self, queue)
+        self.updater = Updater(self, self.stop_event)
         self.updater.start()
-        self.producer = Producer(self, queue, self.stop_event)
-        self.producer.start()
 
     def stopped(self):
         return self.stop_event is None or self.stop_event.is_set()
@@ -107,26 +141,31 @@ class Remote(CBindings):
 
     @property
     def pdirty(self) -> bool:
-        """True iff UI parameters have been updated."""
-        return self.call(self.bind_is_parameters_dirty, ok=(0, 1)) == 1
+        """
+        True iff UI parameters have been updated.
+
+        Reading it clears the flag, if set the state mirror is marked stale.
+        """
+        dirty = self.call(self.bind_is_parameters_dirty, ok=OK_DIRTY) == 1
+        if dirty and self.mirror:
+            self.mirror.stale = True
+        return dirty
 
     @property
     def mdirty(self) -> bool:
         """True iff MB parameters have been updated."""
         try:
-            return self.call(self.bind_macro_button_is_dirty, ok=(0, 1)) == 1
+            return self.call(self.bind_macro_button_is_dirty, ok=OK_DIRTY) == 1
         except AttributeError as e:
             self.logger.exception(f"{type(e).__name__}: {e}")
             raise CAPIError("VBVMR_MacroButton_IsDirty", -9) from e
 
     @property
     def ldirty(self) -> bool:
-        """True iff levels have been updated."""
-        self._strip_buf, self._bus_buf = self._get_levels()
-        return not (
-            self.cache.get("strip_level") == self._strip_buf
-            and self.cache.get("bus_level") == self._bus_buf
-        )
+        """True iff levels have been updated for any subscribed level mode."""
+        self._level_buf = self._get_levels()
+        cache = self.cache.get("levels", {})
+        return any(cache.get(mode) != frame for mode, frame in self._level_buf.items())
 
     def clear_dirty(self) -> None:
         try:
@@ -142,65 +181,87 @@ class Remote(CBindings):
     @polling
     def get(self, param: str, is_string: Optional[bool] = False) -> Union[str, float]:
         """Gets a string or float parameter"""
+        return self._get(param, is_string)
+
+    @property
+    def buffers(self) -> Buffers:
+        """Output buffers for the calling thread"""
+        try:
+            return self._buffers.value
+        except AttributeError:
+            self._buffers.value = Buffers()
+            return self._buffers.value
+
+    def _get(self, param: str, is_string: Optional[bool] = False) -> Union[str, float]:
+        """Gets a string or float parameter from the DLL, bypassing the cache"""
+        buffers = self.buffers
         if is_string:
-            buf = ct.create_unicode_buffer(512)
-            self.call(self.bind_get_parameter_string_w, param.encode(), ct.byref(buf))
-        else:
-            buf = ct.c_float()
-            self.call(self.bind_get_parameter_float, param.encode(), ct.byref(buf))
-        return buf.value
+            self.call(
+                self.bind_get_parameter_string_w, encode(param), buffers.string_ref
+            )
+            return buffers.string.value
+        self.call(self.bind_get_parameter_float, encode(param), buffers.float_ref)
+        return buffers.float.value
 
     def set(self, param: str, val: Union[str, float]) -> None:
-        """Sets a string or float parameter. Caches value"""
+        """
+        Sets a string or float parameter. Caches value
+
+        Inside a batch the write is collected instead, see batch()
+        """
+        if isinstance(val, str) and len(val) >= 512:
+            raise VMError("String is too long")
+        if self.batching:
+            if isinstance(val, str) and '"' in val and not is_call(param):
+                raise VMError("Strings with double quotes can't be batched")
+            # a rewrite moves the parameter to the end, statements run in write order
+            params = self._batch_local.params
+            params.pop(key := param.lower(), None)
+            params[key] = (param, val)
+            return
         if isinstance(val, str):
-            if len(val) >= 512:
-                raise VMError("String is too long")
-            self.call(
-                self.bind_set_parameter_string_w, param.encode(), ct.c_wchar_p(val)
-            )
+            self.call(self.bind_set_parameter_string_w, encode(param), val)
         else:
-            self.call(
-                self.bind_set_parameter_float, param.encode(), ct.c_float(float(val))
-            )
+            self.call(self.bind_set_parameter_float, encode(param), float(val))
         self.cache[param] = val
+        if self.mirror:
+            self.mirror.update(param, val)
+
+    def bus_modes(self) -> tuple:
+        """
+        Returns the mode of every bus as a tuple of BusModes.
+
+        Dirty parameters are cleared once, then each bus reads its mode flags until one is set.
+        """
+        self.clear_dirty()
+        return tuple(bus.mode.read() for bus in self.bus)
 
     @polling
     def get_buttonstatus(self, id_: int, mode: int) -> int:
         """Gets a macrobutton parameter"""
-        c_state = ct.c_float()
+        buffers = self.buffers
         try:
-            self.call(
-                self.bind_macro_button_get_status,
-                ct.c_long(id_),
-                ct.byref(c_state),
-                ct.c_long(mode),
-            )
+            self.call(self.bind_macro_button_get_status, id_, buffers.float_ref, mode)
         except AttributeError as e:
             self.logger.exception(f"{type(e).__name__}: {e}")
             raise CAPIError("VBVMR_MacroButton_GetStatus", -9) from e
-        return int(c_state.value)
+        return int(buffers.float.value)
 
     def set_buttonstatus(self, id_: int, val: int, mode: int) -> None:
         """Sets a macrobutton parameter. Caches value"""
-        c_state = ct.c_float(float(val))
         try:
-            self.call(
-                self.bind_macro_button_set_status,
-                ct.c_long(id_),
-                c_state,
-                ct.c_long(mode),
-            )
+            self.call(self.bind_macro_button_set_status, id_, float(val), mode)
         except AttributeError as e:
             self.logger.exception(f"{type(e).__name__}: {e}")
             raise CAPIError("VBVMR_MacroButton_SetStatus", -9) from e
-        self.cache[f"mb_{id_}_{mode}"] = int(c_state.value)
+        self.cache[f"mb_{id_}_{mode}"] = int(val)
 
     def get_num_devices(self, direction: str = None) -> int:
         """Retrieves number of physical devices connected"""
         if direction not in ("in", "out"):
             raise VMError("Expected a direction: in or out")
         func = getattr(self, f"bind_{direction}put_get_device_number")
-        res = self.call(func, ok_exp=lambda r: r >= 0)
+        res = self.call(func, ok_exp=non_negative)
         return res
 
     def get_device_description(self, index: int, direction: str = None) -> tuple:
@@ -220,40 +281,104 @@ class Remote(CBindings):
         )
         return (name.value, type_.value, hwid.value)
 
+    def dirty_strips(self) -> tuple:
+        """
+        Returns the indices of strips whose levels changed in the last ldirty update, in any subscribed strip level mode.
+
+        Expected to be used in a callback only.
+        """
+        return strip_channel_maps[self.kind.name].dirty(self._level_dirty[0])
+
+    def dirty_buses(self) -> tuple:
+        """
+        Returns the indices of buses whose levels changed in the last ldirty update.
+
+        Expected to be used in a callback only.
+        """
+        return bus_channel_maps[self.kind.name].dirty(self._level_dirty[1])
+
     def get_level(self, type_: int, index: int) -> float:
         """Retrieves a single level value"""
-        val = ct.c_float()
-        self.call(
-            self.bind_get_level, ct.c_long(type_), ct.c_long(index), ct.byref(val)
-        )
-        return val.value
+        buffers = self.buffers
+        self.call(self.bind_get_level, type_, index, buffers.float_ref)
+        return buffers.float.value
 
-    def _get_levels(self) -> Iterable:
+    def _make_level_buffer(self, type_: int) -> tuple:
         """
-        returns both level arrays (strip_levels, bus_levels) BEFORE math conversion
+        Preallocates a float array for a level type.
+
+        Returns the array, a pointer into it for each channel and a zero-copy view over it.
         """
-        return (
-            tuple(
-                self.get_level(self.strip_mode, i)
-                for i in range(self.kind.num_strip_levels)
-            ),
-            tuple(self.get_level(3, i) for i in range(self.kind.num_bus_levels)),
+        num = self.kind.num_bus_levels if type_ == 3 else self.kind.num_strip_levels
+        buf = (ct.c_float * num)()
+        size = ct.sizeof(ct.c_float)
+        ptrs = tuple(
+            ct.pointer(ct.c_float.from_buffer(buf, i * size)) for i in range(num)
         )
+        return buf, ptrs, memoryview(buf).cast("B").cast("f")
+
+    def _fill_levels(self, type_: int) -> memoryview:
+        """Fills the calling thread's buffer for a level type in a single pass, returns its view"""
+        levels = self.buffers.levels
+        try:
+            _, ptrs, view = levels[type_]
+        except KeyError:
+            _, ptrs, view = levels[type_] = self._make_level_buffer(type_)
+        func = self.bind_get_level
+        for i, ptr in enumerate(ptrs):
+            self.call(func, type_, i, ptr)
+        return view
+
+    def levels_snapshot(self, strip_mode: int = 0) -> tuple:
+        """
+        Reads every strip and bus level channel into preallocated buffers.
+
+        Returns zero-copy views (strip_levels, bus_levels) BEFORE math conversion.
+
+        The views are overwritten by the next snapshot in the same thread, copy them to keep a frame.
+        """
+        return self._fill_levels(strip_mode), self._fill_levels(3)
+
+    @property
+    def level_modes(self) -> tuple:
+        """Returns the level modes polled by the events thread (0-2 strip, 3 bus)"""
+        return tuple(mode for mode in range(4) if self._level_mask >> mode & 1)
+
+    def subscribe_level(self, mode: int) -> None:
+        """
+        Adds a level mode to those polled by the events thread.
+
+        Reading a level property of an unpolled mode subscribes to it, it is polled until unsubscribed.
+        """
+        if mode not in range(4):
+            raise VMError(f"Expected a level mode from 0 to 3, got {mode}")
+        self._level_mask |= 1 << mode
+
+    def unsubscribe_level(self, mode: int) -> None:
+        """Stops the events thread polling a level mode, its cached frame is no longer used"""
+        if mode not in range(4):
+            raise VMError(f"Expected a level mode from 0 to 3, got {mode}")
+        self._level_mask &= ~(1 << mode)
+        for key in ("levels", "levels_db"):
+            self.cache.get(key, {}).pop(mode, None)
+
+    def _get_levels(self) -> dict:
+        """
+        returns a level array for each subscribed level mode BEFORE math conversion
+        """
+        return {mode: tuple(self._fill_levels(mode)) for mode in self.level_modes}
 
     def get_midi_message(self):
-        n = ct.c_long(1024)
-        buf = ct.create_string_buffer(1024)
+        buffers = self.buffers
         res = self.call(
             self.bind_get_midi_message,
-            ct.byref(buf),
-            n,
-            ok=(-5, -6),  # no data received from midi device
-            ok_exp=lambda r: r >= 0,
+            buffers.midi_ref,
+            1024,
+            ok=OK_NO_MIDI,
+            ok_exp=non_negative,
         )
         if res > 0:
-            vals = tuple(
-                grouper(3, (int.from_bytes(buf[i], "little") for i in range(res)))
-            )
+            vals = tuple(grouper(3, buffers.midi.raw[:res]))
             for msg in vals:
                 ch, pitch, vel = msg
                 if not self.midi._channel or self.midi._channel != ch:
@@ -263,42 +388,156 @@ class Remote(CBindings):
             return True
 
     @script
-    def sendtext(self, script: str):
-        """Sets many parameters from a script"""
+    def _sendtext(self, script: str):
+        """Sets many parameters from a script, without delay"""
         if len(script) > 48000:
             raise ValueError("Script too large, max size 48kB")
         self.call(self.bind_set_parameters, script.encode())
+
+    def sendtext(self, script: Union[str, dict]):
+        """Sets many parameters from a script"""
+        self._sendtext(script)
         time.sleep(self.DELAY * 5)
 
+    @property
+    def batching(self) -> bool:
+        """True iff parameter writes on this thread are being collected by batch()"""
+        return getattr(self._batch_local, "params", None) is not None
+
+    @contextmanager
+    def batch(self):
+        """
+        Collects parameter writes made on this thread, the last write to a parameter wins
+        and takes the place of that write in the script.
+
+        On exit they are flushed as one or more scripts. If an exception is raised they are discarded.
+        """
+        if self.batching:  # nested, the outermost batch flushes
+            yield self
+            return
+        self._batch_local.params = {}
+        try:
+            yield self
+            params = self._batch_local.params
+        finally:
+            self._batch_local.params = None
+        for chunk in script_chunks(params.values()):
+            self.sendtext(chunk)
+        self.cache |= dict(params.values())
+        if self.mirror:
+            for param, val in params.values():
+                self.mirror.update(param, val)
+
+    def enable_mirror(self) -> StateMirror:
+        """
+        Mirrors every readable parameter for the kind in memory.
+
+        Parameter reads are served from the mirror, it is refreshed in bulk when parameters are dirty.
+        """
+        if not self.mirror:
+            self.mirror = StateMirror(self)
+            self.mirror.refresh()
+        return self.mirror
+
+    def disable_mirror(self) -> None:
+        """Parameter reads go to the DLL again"""
+        self.mirror = None
+
+    def enable_metrics(self) -> Metrics:
+        """
+        Counts calls, latency and error codes per VBVMR function.
+
+        See metrics() for a snapshot.
+        """
+        if not self._metrics:
+            self._metrics = Metrics(self.call)
+            self.call = self._metrics.call
+        return self._metrics
+
+    def disable_metrics(self) -> None:
+        """Stops counting calls"""
+        if self._metrics:
+            if self.call == self._metrics.call:
+                self.call = self._metrics._call
+            self._metrics.close()
+            self._metrics = None
+
+    def metrics(self) -> dict:
+        """Returns a snapshot of the call metrics, per VBVMR function"""
+        if not self._metrics:
+            raise VMError(
+                "Metrics not enabled, pass metrics=True or call enable_metrics()"
+            )
+        return self._metrics.snapshot()
+
+    @contextmanager
+    def trace(self, path: Optional[str] = None):
+        """
+        Records every call made to the DLL while the block runs.
+
+        Yields the Tracer, if path is given the calls are also written to it as JSON lines.
+        Once the block exits the Tracer stops recording.
+        """
+        prev = vars(self).get("call")
+        tracer = Tracer(self.call, path)
+        self.call = tracer.call
+        try:
+            yield tracer
+        finally:
+            # if the tracer was wrapped inside the block, e.g. by enable_metrics(), the wrapper stays
+            # and the closed tracer passes calls through
+            if self.call == tracer.call:
+                if prev is None:
+                    del self.call
+                else:
+                    self.call = prev
+            tracer.close()
+
+    def _target(self, key: str):
+        """returns the object a config key refers to"""
+        match key.split("-"):
+            case ["strip" | "bus" | "button" as kls, index] if index.isnumeric():
+                target = getattr(self, kls)
+            case [
+                "vban",
+                "in" | "instream" | "out" | "outstream" as direction,
+                index,
+            ] if index.isnumeric():
+                target = getattr(self.vban, f"{direction.removesuffix('stream')}stream")
+            case _:
+                ERR_MSG = f"invalid config key '{key}'"
+                self.logger.error(ERR_MSG)
+                raise ValueError(ERR_MSG)
+        return target[int(index)]
+
     def apply(self, data: dict):
         """
         Sets all parameters of a dict
 
         minor delay between each recursion
         """
+        [self._target(key).apply(di).then_wait() for key, di in data.items()]
 
-        def target(key):
-            match key.split("-"):
-                case ["strip" | "bus" | "button" as kls, index] if index.isnumeric():
-                    target = getattr(self, kls)
-                case [
-                    "vban",
-                    "in" | "instream" | "out" | "outstream" as direction,
-                    index,
-                ] if index.isnumeric():
-                    target = getattr(
-                        self.vban, f"{direction.removesuffix('stream')}stream"
-                    )
-                case _:
-                    ERR_MSG = f"invalid config key '{key}'"
-                    self.logger.error(ERR_MSG)
-                    raise ValueError(ERR_MSG)
-            return target[int(index)]
-
-        [target(key).apply(di).then_wait() for key, di in data.items()]
-
-    def apply_config(self, name):
-        """applies a config from memory"""
+    def _compile(self, data: dict) -> tuple:
+        """
+        Compiles a dict of parameters into a flat tuple of (param, value) pairs.
+
+        The setters are run with their writes collected rather than sent,
+        so each value is validated and converted once.
+
+        Macrobuttons can't be scripted, they are returned separately.
+        """
+        buttons = {k: v for k, v in data.items() if k.split("-")[0] == "button"}
+        prev = getattr(self._batch_local, "params", None)
+        self._batch_local.params = {}
+        try:
+            self.apply({k: v for k, v in data.items() if k not in buttons})
+            return tuple(self._batch_local.params.values()), buttons
+        finally:
+            self._batch_local.params = prev
+
+    def _config_sources(self, name) -> tuple:
+        """returns a config from memory, followed by the config it extends if any"""
         ERR_MSG = (
             f"No config with name '{name}' is loaded into memory",
             f"Known configs: {list(self.configs.keys())}",
@@ -310,23 +549,117 @@ class Remote(CBindings):
             raise VMError(("\n").join(ERR_MSG)) from e
 
         if "extends" in config:
-            extended = config["extends"]
+            return config, self.configs[config["extends"]]
+        return (config,)
+
+    def _config(self, name) -> dict:
+        """returns a config from memory, merged with the config it extends"""
+        config, *extended = self._config_sources(name)
+        if extended:
+            self.logger.debug(
+                f"profile '{name}' extends '{config['extends']}', profiles merged.."
+            )
             config = {
-                k: v
-                for k, v in deep_merge(self.configs[extended], config)
-                if k not in ("extends")
+                k: v for k, v in deep_merge(extended[0], config) if k not in ("extends")
             }
+        return config
+
+    def _compile_config(self, name) -> tuple:
+        """
+        Returns a config compiled into (scripts, params, buttons).
+
+        Compiled configs are cached against the config dicts they were compiled from.
+        A config replaced in memory or reloaded by the loader (or a replaced config it extends)
+        is merged and compiled again, a cached config is neither merged nor compiled.
+        """
+        sources = self._config_sources(name)
+        cached_sources, compiled = self._compiled_configs.get(name, ((), None))
+        if len(cached_sources) == len(sources) and all(
+            map(operator.is_, cached_sources, sources)
+        ):
+            return compiled
+
+        config = self._config(name)
+        params, buttons = self._compile(config)
+        compiled = (tuple(script_chunks(params)), params, buttons)
+        self._compiled_configs[name] = (sources, compiled)
+        self.logger.debug(
+            f"profile '{name}' compiled into {len(compiled[0])} script(s)"
+        )
+        return compiled
+
+    def _diff(self, params: tuple, buttons: dict) -> tuple:
+        """
+        Reads the current value of each parameter, dirty parameters are cleared once first.
+        Write only parameters and function calls such as FadeTo are not read, they are always written.
+
+        Returns (params, buttons) with values already held by Voicemeeter removed.
+        """
+        self.clear_dirty()
+        unread = write_only(self.kind.name)
+        changed = []
+        for param, val in params:
+            is_string = isinstance(val, str)
+            if is_call(param) or param.rsplit(".", 1)[-1].lower() in unread:
+                changed.append((param, val))
+                continue
+            try:
+                current = self._get(param, is_string)
+            except CAPIError:
+                changed.append((param, val))
+                continue
+            if is_string:
+                if current != val:
+                    changed.append((param, val))
+            elif current != ct.c_float(float(val)).value:
+                changed.append((param, val))
+
+        changed_buttons = {}
+        for key, di in buttons.items():
+            button = self._target(key)
+            if di := {
+                attr: val for attr, val in di.items() if getattr(button, attr) != val
+            }:
+                changed_buttons[key] = di
+        return tuple(changed), changed_buttons
+
+    def _apply_config_steps(self, name, diff: bool) -> Iterator[float]:
+        """
+        Generator function, applies a config one script or button at a time.
+
+        Yields the delay to wait after each step, apply_config() sleeps it and AsyncRemote awaits it.
+        """
+        scripts, params, buttons = self._compile_config(name)
+        if diff:
+            params, buttons = self._diff(params, buttons)
+            scripts = tuple(script_chunks(params))
             self.logger.debug(
-                f"profile '{name}' extends '{extended}', profiles merged.."
+                f"profile '{name}': {len(params)} parameter(s) differ from current values"
             )
-        self.apply(config)
+        for chunk in scripts:
+            self._sendtext(chunk)
+            yield self.DELAY * 5
+        self.cache |= dict(params)
+        for key, di in buttons.items():
+            self._target(key).apply(di)
+            yield self.DELAY
         self.logger.info(f"Profile '{name}' applied!")
 
+    def apply_config(self, name, diff: bool = False):
+        """
+        applies a config from memory, compiled into scripts on first use
+
+        If diff, only parameters that differ from their current value are written.
+        """
+        for delay in self._apply_config_steps(name, diff):
+            time.sleep(delay)
+
     def end_thread(self):
         if not self.stopped():
             self.logger.debug("events thread shutdown started")
             self.stop_event.set()
-            self.producer.join()  # wait for producer thread to complete cycle
+            if threading.current_thread() is not self.updater:
+                self.updater.join()  # wait for updater thread to complete cycle
 
     def logout(self) -> None:
         """Logout of the API"""
@@ -0,0 +1,211 @@
+from dataclasses import asdict, dataclass
+from functools import cache
+from typing import Iterator, Optional
+
+from .kinds import request_kind_map as kindmap
+
+# API names of parameters written as a call, their value is an argument list such as (-6.0, 500)
+CALLS = frozenset(("fadeto", "fadeby", "appgain", "appmute"))
+
+
+@dataclass(frozen=True)
+class Param:
+    """
+    A single parameter.
+
+    name is the attribute it is exposed as, param the name sent to the API.
+    access is "rw", "r" or "w". If sync, dirty parameters are cleared before reading.
+    """
+
+    name: str
+    param: str
+    type: type
+    range: Optional[tuple] = None
+    access: str = "rw"
+    sync: bool = False
+
+    def as_dict(self) -> dict:
+        return asdict(self) | {"type": self.type.__name__}
+
+
+@dataclass(frozen=True)
+class Section:
+    """Parameters sharing an identifier template"""
+
+    identifier: str
+    params: tuple
+
+    def __iter__(self) -> Iterator[Param]:
+        return iter(self.params)
+
+
+def _bools(*names, **kwargs) -> tuple:
+    return tuple(Param(name, name, bool, **kwargs) for name in names)
+
+
+def _floats(*names, range_=None) -> tuple:
+    return tuple(Param(name, name, float, range_) for name in names)
+
+
+def _device() -> tuple:
+    return tuple(
+        Param(name, name, str, access="w") for name in ("wdm", "ks", "mme", "asio")
+    ) + (
+        Param("name", "name", str, access="r"),
+        Param("sr", "sr", int, access="r"),
+    )
+
+
+def _strip(kind, is_phys) -> tuple:
+    params = (
+        *_bools("mute", "solo"),
+        Param("limit", "limit", int, (-40, 12)),
+        Param("label", "Label", str),
+        Param("gain", "gain", float, (-60, 12)),
+        *_bools(*(f"A{i}" for i in range(1, kind.phys_out + 1))),
+        *_bools(*(f"B{i}" for i in range(1, kind.virt_out + 1))),
+        Param("pan_x", "pan_x", float, (-0.5, 0.5)),
+    )
+    if is_phys:
+        params += (
+            *_bools("mono"),
+            Param("audibility", "audibility", float, (0, 10)),
+            Param("pan_y", "pan_y", float, (0, 1)),
+            Param("color_x", "color_x", float, (-0.5, 0.5)),
+            Param("color_y", "color_y", float, (0, 1)),
+            Param("fx_x", "fx_x", float, (-0.5, 0.5)),
+            Param("fx_y", "fx_y", float, (0, 1)),
+        )
+    else:
+        params += (
+            *_bools("mc"),
+            Param("k", "karaoke", int, (0, 4)),
+            Param("bass", "EQGain1", float, (-12, 12)),
+            Param("mid", "EQGain2", float, (-12, 12)),
+            Param("treble", "EQGain3", float, (-12, 12)),
+            Param("pan_y", "pan_y", float, (-0.5, 0.5)),
+        )
+    if is_phys and kind.name == "potato":
+        params += (
+            *_floats("reverb", "delay", "fx1", "fx2", range_=(0, 10)),
+            *_bools("postreverb", "postdelay", "postfx1", "postfx2"),
+        )
+    return params
+
+
+def _bus(kind) -> tuple:
+    params = (
+        *_bools("mute", "mono", "sel", "monitor"),
+        Param("label", "Label", str),
+        Param("gain", "gain", float, (-60, 12)),
+    )
+    if kind.name == "potato":
+        params += _floats(
+            "returnreverb", "returndelay", "returnfx1", "returnfx2", range_=(0, 10)
+        )
+    return params
+
+
+@cache
+def request_schema(kind_id: str) -> dict:
+    """
+    Returns the parameter schema for a kind, {section name: Section}.
+
+    Built once per kind.
+    """
+    kind = kindmap(kind_id)
+    schema = {
+        "PhysicalStrip": Section("strip[{index}]", _strip(kind, True)),
+        "VirtualStrip": Section("strip[{index}]", _strip(kind, False)),
+        "StripComp": Section(
+            "Strip[{index}].comp",
+            (
+                Param("knob", "", float, (0, 10)),
+                Param("gainin", "GainIn", float, (-24, 24)),
+                Param("ratio", "Ratio", float, (1, 8)),
+                Param("threshold", "Threshold", float, (-40, -3)),
+                Param("attack", "Attack", float, (0, 200)),
+                Param("release", "Release", float, (0, 5000)),
+                Param("knee", "Knee", float, (0, 1)),
+                Param("gainout", "GainOut", float, (-24, 24)),
+                *_bools("makeup"),
+            ),
+        ),
+        "StripGate": Section(
+            "Strip[{index}].gate",
+            (
+                Param("knob", "", float, (0, 10)),
+                Param("threshold", "Threshold", float, (-60, -10)),
+                Param("damping", "Damping", float, (-60, -10)),
+                Param("bpsidechain", "BPSidechain", int, (100, 4000)),
+                Param("attack", "Attack", float, (0, 1000)),
+                Param("hold", "Hold", float, (0, 5000)),
+                Param("release", "Release", float, (0, 5000)),
+            ),
+        ),
+        "StripDenoiser": Section(
+            "Strip[{index}].denoiser", (Param("knob", "", float, (0, 10)),)
+        ),
+        "StripEQ": Section("Strip[{index}].eq", _bools("on", "ab")),
+        "StripDevice": Section("Strip[{index}].device", _device()),
+        "PhysicalBus": Section("bus[{index}]", _bus(kind)),
+        "VirtualBus": Section("bus[{index}]", _bus(kind)),
+        "BusEQ": Section("Bus[{index}].eq", _bools("on", "ab")),
+        "BusMode": Section(
+            "Bus[{index}].mode",
+            _bools(
+                "normal",
+                "amix",
+                "bmix",
+                "repeat",
+                "composite",
+                "tvmix",
+                "upmix21",
+                "upmix41",
+                "upmix61",
+                "centeronly",
+                "lfeonly",
+                "rearonly",
+                sync=True,
+            ),
+        ),
+        "BusDevice": Section("Bus[{index}].device", _device()),
+    }
+    if kind.name == "potato":
+        schema["GainLayer"] = Section(
+            "Strip[{index}]",
+            tuple(
+                Param("gain", f"GainLayer[{i}]", float, (-60, 12))
+                for i in range(kind.num_bus)
+            ),
+        )
+    return schema
+
+
+def is_call(param: str) -> bool:
+    """True if param, for example Strip[0].FadeTo, takes an argument list rather than a value"""
+    return param.rsplit(".", 1)[-1].lower() in CALLS
+
+
+@cache
+def write_only(kind_id: str) -> frozenset:
+    """Returns the API names of the write only parameters for a kind, lowercased"""
+    return frozenset(
+        param.param.lower()
+        for section in request_schema(kind_id).values()
+        for param in section
+        if param.access == "w"
+    )
+
+
+def catalogue(kind_id: str) -> list:
+    """
+    Returns every strip and bus parameter for a kind as a list of dicts.
+
+    Suitable for serializing, each dict names its section and identifier template.
+    """
+    return [
+        {"section": name, "identifier": section.identifier} | param.as_dict()
+        for name, section in request_schema(kind_id).items()
+        for param in section
+    ]
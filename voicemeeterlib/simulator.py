@@ -0,0 +1,291 @@
+import ctypes as ct
+import functools
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+from ctypes.wintypes import CHAR, FLOAT, LONG, WCHAR
+from typing import Callable, Optional, Union
+
+from .kinds import KindId
+from .kinds import request_kind_map as kindmap
+
+logger = logging.getLogger(__name__)
+
+
+ROOTS = ("strip", "bus", "vban", "recorder", "patch", "option", "fx", "command")
+
+# a value is a quoted string, a parenthesized argument list such as (-6.0, 500), or a bare value
+STATEMENT = re.compile(
+    r'\s*([^=;,\n]+?)\s*=\s*("[^"]*"|\((?:"[^"]*"|[^")])*\)|[^;,\n]*)'
+)
+
+
+DEVICE_DESC = (LONG, ct.POINTER(LONG), ct.POINTER(WCHAR * 256), ct.POINTER(WCHAR * 256))
+
+PROTOTYPES = {
+    "VBVMR_Login": (),
+    "VBVMR_Logout": (),
+    "VBVMR_RunVoicemeeter": (LONG,),
+    "VBVMR_GetVoicemeeterType": (ct.POINTER(LONG),),
+    "VBVMR_GetVoicemeeterVersion": (ct.POINTER(LONG),),
+    "VBVMR_MacroButton_IsDirty": (),
+    "VBVMR_MacroButton_GetStatus": (LONG, ct.POINTER(FLOAT), LONG),
+    "VBVMR_MacroButton_SetStatus": (LONG, FLOAT, LONG),
+    "VBVMR_IsParametersDirty": (),
+    "VBVMR_GetParameterFloat": (ct.POINTER(CHAR), ct.POINTER(FLOAT)),
+    "VBVMR_SetParameterFloat": (ct.POINTER(CHAR), FLOAT),
+    "VBVMR_GetParameterStringW": (ct.POINTER(CHAR), ct.POINTER(WCHAR * 512)),
+    "VBVMR_SetParameterStringW": (ct.POINTER(CHAR), ct.POINTER(WCHAR)),
+    "VBVMR_SetParameters": (ct.POINTER(CHAR),),
+    "VBVMR_GetLevel": (LONG, LONG, ct.POINTER(FLOAT)),
+    "VBVMR_Input_GetDeviceNumber": (),
+    "VBVMR_Input_GetDeviceDescW": DEVICE_DESC,
+    "VBVMR_Output_GetDeviceNumber": (),
+    "VBVMR_Output_GetDeviceDescW": DEVICE_DESC,
+    "VBVMR_GetMidiMessage": (ct.POINTER(CHAR * 1024), LONG),
+}
+
+
+def make_functions(handlers: dict) -> dict:
+    """
+    Wraps a Python handler for each VBVMR function in a ctypes function pointer.
+
+    Returns {name: function pointer}, the pointers are bound as DLL functions are.
+    """
+    funcs = {}
+    for name, fn in handlers.items():
+        funcs[name] = ct.CFUNCTYPE(LONG, *PROTOTYPES[name])(fn)
+        funcs[name].__name__ = name
+    return funcs
+
+
+def sine(type_: int, index: int, t: float) -> float:
+    """Default level signal, a 1Hz sine per channel, each a little out of phase"""
+    return abs(math.sin(2 * math.pi * t + index * 0.1)) * (0.5 if type_ == 3 else 0.25)
+
+
+class Simulator:
+    """
+    Pure-Python, in-memory stand in for VoicemeeterRemote.
+
+    Each VBVMR function is a ctypes function pointer backed by Python, so the bindings are exercised as they are with the DLL.
+
+    Parameters are case-insensitive, unset ones read as 0.0 or "". Writes mark parameters dirty,
+    button writes mark macrobuttons dirty. Levels are generated by signal(type_, index, t).
+
+    latency is the time each call takes in seconds, or a dict of seconds per VBVMR function name.
+    """
+
+    VERSION = (1, 1, 8)
+
+    DEVICES = {
+        "in": (("Microphone (Simulated)", 3, "SIM-IN-0"),),
+        "out": (
+            ("Speakers (Simulated)", 3, "SIM-OUT-0"),
+            ("Headphones (Simulated)", 3, "SIM-OUT-1"),
+        ),
+    }
+
+    def __init__(
+        self,
+        kind_id: str,
+        latency: Union[float, dict] = 0.0,
+        signal: Callable[[int, int, float], float] = sine,
+        devices: Optional[dict] = None,
+    ):
+        self.kind = kindmap(kind_id)
+        self.latency = latency
+        self.signal = signal
+        self.devices = {k: list(v) for k, v in (devices or self.DEVICES).items()}
+        self.params = {}
+        self.buttons = {}
+        self.midi = deque()
+        self.logged_in = False
+        self._pdirty = False
+        self._mdirty = False
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.logger = logger.getChild(self.__class__.__name__)
+
+        handlers = {
+            "VBVMR_Login": self._login,
+            "VBVMR_Logout": self._logout,
+            "VBVMR_RunVoicemeeter": lambda kind: 0,
+            "VBVMR_GetVoicemeeterType": self._type,
+            "VBVMR_GetVoicemeeterVersion": self._version,
+            "VBVMR_MacroButton_IsDirty": self._is_mdirty,
+            "VBVMR_MacroButton_GetStatus": self._button_status,
+            "VBVMR_MacroButton_SetStatus": self._set_button_status,
+            "VBVMR_IsParametersDirty": self._is_pdirty,
+            "VBVMR_GetParameterFloat": self._get_float,
+            "VBVMR_SetParameterFloat": self._set_float,
+            "VBVMR_GetParameterStringW": self._get_string,
+            "VBVMR_SetParameterStringW": self._set_string,
+            "VBVMR_SetParameters": self._set_parameters,
+            "VBVMR_GetLevel": self._level,
+            "VBVMR_Input_GetDeviceNumber": lambda: len(self.devices["in"]),
+            "VBVMR_Input_GetDeviceDescW": functools.partial(self._device_desc, "in"),
+            "VBVMR_Output_GetDeviceNumber": lambda: len(self.devices["out"]),
+            "VBVMR_Output_GetDeviceDescW": functools.partial(self._device_desc, "out"),
+            "VBVMR_GetMidiMessage": self._midi,
+        }
+        for name, func in make_functions(
+            {name: self._delayed(name, fn) for name, fn in handlers.items()}
+        ).items():
+            setattr(self, name, func)
+
+    def __str__(self):
+        return f"{type(self).__name__}{self.kind}"
+
+    def _delayed(self, name: str, fn):
+        """Wraps fn, sleeping for its latency first"""
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            if isinstance(self.latency, dict):
+                latency = self.latency.get(name, 0)
+            else:
+                latency = self.latency
+            if latency:
+                time.sleep(latency)
+            return fn(*args)
+
+        return wrapper
+
+    @staticmethod
+    def _name(param) -> str:
+        return ct.cast(param, ct.c_char_p).value.decode()
+
+    @staticmethod
+    def _is_known(key: str) -> bool:
+        return key.split(".")[0].split("[")[0] in ROOTS
+
+    def _login(self):
+        self.logged_in = True
+        self._pdirty = self._mdirty = True
+        return 0
+
+    def _logout(self):
+        self.logged_in = False
+        return 0
+
+    def _type(self, ptr):
+        ptr[0] = KindId[self.kind.name.upper()].value
+        return 0
+
+    def _version(self, ptr):
+        ptr[0] = functools.reduce(
+            lambda v, n: v << 8 | n, self.VERSION, KindId[self.kind.name.upper()].value
+        )
+        return 0
+
+    def _is_pdirty(self):
+        with self._lock:
+            dirty, self._pdirty = self._pdirty, False
+        return int(dirty)
+
+    def _is_mdirty(self):
+        with self._lock:
+            dirty, self._mdirty = self._mdirty, False
+        return int(dirty)
+
+    def _button_status(self, id_, ptr, mode):
+        ptr[0] = self.buttons.get((id_, mode), 0.0)
+        return 0
+
+    def _set_button_status(self, id_, val, mode):
+        with self._lock:
+            self.buttons[(id_, mode)] = val
+            self._mdirty = True
+        return 0
+
+    def _get_float(self, param, ptr):
+        if not self._is_known(key := self._name(param).lower()):
+            return -3
+        val = self.params.get(key, 0.0)
+        ptr[0] = 0.0 if isinstance(val, str) else val
+        return 0
+
+    def _get_string(self, param, ptr):
+        if not self._is_known(key := self._name(param).lower()):
+            return -3
+        ptr.contents.value = str(self.params.get(key, ""))
+        return 0
+
+    def _write(self, key: str, val: Union[str, float]):
+        with self._lock:
+            if ".mode." in key and key.startswith("bus") and val:
+                # bus modes are exclusive
+                root = key.rsplit(".", 1)[0]
+                for k in [k for k in self.params if k.startswith(f"{root}.")]:
+                    self.params[k] = 0.0
+            self.params[key] = val
+            self._pdirty = True
+
+    def _set_float(self, param, val):
+        if not self._is_known(key := self._name(param).lower()):
+            return -3
+        self._write(key, val)
+        return 0
+
+    def _set_string(self, param, val):
+        if not self._is_known(key := self._name(param).lower()):
+            return -3
+        self._write(key, ct.cast(val, ct.c_wchar_p).value)
+        return 0
+
+    def _set_parameters(self, script):
+        """Returns the number of the first statement that fails, 0 on success"""
+        for i, (param, val) in enumerate(
+            STATEMENT.findall(ct.cast(script, ct.c_char_p).value.decode()), start=1
+        ):
+            if not self._is_known(key := param.lower()):
+                return i
+            try:
+                self._write(key, float(val))
+            except ValueError:
+                self._write(key, val.strip('"'))
+        return 0
+
+    def _level(self, type_, index, ptr):
+        num = self.kind.num_bus_levels if type_ == 3 else self.kind.num_strip_levels
+        if type_ not in range(4) or index not in range(num):
+            return -3
+        ptr[0] = self.signal(type_, index, time.monotonic() - self._start)
+        return 0
+
+    def _device_desc(self, direction, index, type_, name, hwid):
+        try:
+            name_, type__, hwid_ = self.devices[direction][index]
+        except IndexError:
+            return -3
+        type_[0] = type__
+        name.contents.value = name_
+        hwid.contents.value = hwid_
+        return 0
+
+    def _midi(self, buf, n):
+        with self._lock:
+            if not self.midi:
+                return -5
+            msg = b""
+            while self.midi and len(msg) + len(self.midi[0]) <= n:
+                msg += self.midi.popleft()
+        ct.memmove(buf, msg, len(msg))
+        return len(msg)
+
+    def push_midi(self, channel: int, pitch: int, velocity: int):
+        """Queues a MIDI message, read by the next VBVMR_GetMidiMessage"""
+        with self._lock:
+            self.midi.append(bytes((channel, pitch, velocity)))
+
+    def reset(self):
+        """Clears every parameter, button and queued MIDI message"""
+        with self._lock:
+            self.params.clear()
+            self.buttons.clear()
+            self.midi.clear()
+            self._pdirty = self._mdirty = True
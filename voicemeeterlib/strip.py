@@ -1,11 +1,13 @@
 import time
 from abc import abstractmethod
-from math import log
+from functools import cache, partial
 from typing import Union
 
-from .iremote import IRemote
+from . import history, levels
+from .iremote import IndexedView, IRemote
 from .kinds import kinds_all
-from .meta import bool_prop, device_prop, float_prop
+from .meta import schema_props
+from .schema import request_schema
 
 
 class Strip(IRemote):
@@ -15,6 +17,16 @@ class Strip(IRemote):
     Defines concrete implementation for strip
     """
 
+    __slots__ = ("levels", "gainlayer")
+
+    def __init__(self, remote, index):
+        super().__init__(remote, index)
+        self.levels = StripLevel(remote, index)
+        if remote.kind.name == "potato":
+            self.gainlayer = IndexedView(
+                partial(GainLayer, remote, index), remote.kind.num_bus
+            )
+
     @abstractmethod
     def __str__(self):
         pass
@@ -81,26 +93,33 @@ class Strip(IRemote):
 
 
 class PhysicalStrip(Strip):
+    __slots__ = ("comp", "gate", "denoiser", "eq", "device")
+
     @classmethod
-    def make(cls, remote, i, is_phys):
+    @cache
+    def make(cls, kind_id: str):
         """
         Factory method for PhysicalStrip.
 
-        Returns a PhysicalStrip class.
+        Returns a PhysicalStrip class of a kind, generated once from its schema.
         """
-        EFFECTS_cls = _make_effects_mixins(is_phys)[remote.kind.name]
         return type(
-            "PhysicalStrip",
-            (cls, EFFECTS_cls),
+            f"PhysicalStrip{kind_id.capitalize()}",
+            (cls,),
             {
-                "comp": StripComp(remote, i),
-                "gate": StripGate(remote, i),
-                "denoiser": StripDenoiser(remote, i),
-                "eq": StripEQ(remote, i),
-                "device": StripDevice.make(remote, i),
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["PhysicalStrip"], cls),
             },
         )
 
+    def __init__(self, remote, index):
+        super().__init__(remote, index)
+        self.comp = StripComp.make(remote.kind.name)(remote, index)
+        self.gate = StripGate.make(remote.kind.name)(remote, index)
+        self.denoiser = StripDenoiser.make(remote.kind.name)(remote, index)
+        self.eq = StripEQ(remote, index)
+        self.device = StripDevice.make(remote.kind.name)(remote, index)
+
     def __str__(self):
         return f"{type(self).__name__}{self.index}"
 
@@ -114,6 +133,25 @@ class PhysicalStrip(Strip):
 
 
 class StripComp(IRemote):
+    __slots__ = ()
+
+    @classmethod
+    @cache
+    def make(cls, kind_id: str):
+        """
+        Factory method for strip.comp.
+
+        Returns a StripComp class of a kind, setters range checked from its schema.
+        """
+        return type(
+            f"StripComp{kind_id.capitalize()}",
+            (cls,),
+            {
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["StripComp"], cls),
+            },
+        )
+
     @property
     def identifier(self) -> str:
         return f"Strip[{self.index}].comp"
@@ -192,6 +230,25 @@ class StripComp(IRemote):
 
 
 class StripGate(IRemote):
+    __slots__ = ()
+
+    @classmethod
+    @cache
+    def make(cls, kind_id: str):
+        """
+        Factory method for strip.gate.
+
+        Returns a StripGate class of a kind, setters range checked from its schema.
+        """
+        return type(
+            f"StripGate{kind_id.capitalize()}",
+            (cls,),
+            {
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["StripGate"], cls),
+            },
+        )
+
     @property
     def identifier(self) -> str:
         return f"Strip[{self.index}].gate"
@@ -254,6 +311,25 @@ class StripGate(IRemote):
 
 
 class StripDenoiser(IRemote):
+    __slots__ = ()
+
+    @classmethod
+    @cache
+    def make(cls, kind_id: str):
+        """
+        Factory method for strip.denoiser.
+
+        Returns a StripDenoiser class of a kind, setters range checked from its schema.
+        """
+        return type(
+            f"StripDenoiser{kind_id.capitalize()}",
+            (cls,),
+            {
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["StripDenoiser"], cls),
+            },
+        )
+
     @property
     def identifier(self) -> str:
         return f"Strip[{self.index}].denoiser"
@@ -268,6 +344,8 @@ class StripDenoiser(IRemote):
 
 
 class StripEQ(IRemote):
+    __slots__ = ()
+
     @property
     def identifier(self) -> str:
         return f"Strip[{self.index}].eq"
@@ -290,29 +368,24 @@ class StripEQ(IRemote):
 
 
 class StripDevice(IRemote):
+    __slots__ = ()
+
     @classmethod
-    def make(cls, remote, i):
+    @cache
+    def make(cls, kind_id: str):
         """
-        Factory function for strip.device.
+        Factory method for strip.device.
 
         Returns a StripDevice class of a kind.
         """
-        DEVICE_cls = type(
-            f"StripDevice{remote.kind}",
+        return type(
+            f"StripDevice{kind_id.capitalize()}",
             (cls,),
             {
-                **{
-                    param: device_prop(param)
-                    for param in [
-                        "wdm",
-                        "ks",
-                        "mme",
-                        "asio",
-                    ]
-                },
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["StripDevice"], cls),
             },
         )
-        return DEVICE_cls(remote, i)
 
     @property
     def identifier(self) -> str:
@@ -328,18 +401,23 @@ class StripDevice(IRemote):
 
 
 class VirtualStrip(Strip):
+    __slots__ = ()
+
     @classmethod
-    def make(cls, remote, i, is_phys):
+    @cache
+    def make(cls, kind_id: str):
         """
         Factory method for VirtualStrip.
 
-        Returns a VirtualStrip class.
+        Returns a VirtualStrip class of a kind, generated once from its schema.
         """
-        EFFECTS_cls = _make_effects_mixins(is_phys)[remote.kind.name]
         return type(
-            "VirtualStrip",
-            (cls, EFFECTS_cls),
-            {},
+            f"VirtualStrip{kind_id.capitalize()}",
+            (cls,),
+            {
+                "__slots__": (),
+                **schema_props(request_schema(kind_id)["VirtualStrip"], cls),
+            },
         )
 
     def __str__(self):
@@ -399,28 +477,34 @@ class VirtualStrip(Strip):
 
 
 class StripLevel(IRemote):
+    __slots__ = ("range", "_mask")
+
     def __init__(self, remote, index):
         super().__init__(remote, index)
         self.range = _make_strip_level_maps[remote.kind.name][self.index]
+        self._mask = strip_channel_maps[remote.kind.name].masks[self.index]
 
     def getter(self, mode):
         """
         Returns a tuple of level values for the channel.
 
-        If observables thread running and level updates are subscribed to, fetch values from cache
+        If observables thread running and level updates are subscribed to, slice the converted frame in cache
 
-        Otherwise call CAPI func.
+        Otherwise call CAPI func and convert the values for this channel.
+        The mode is then subscribed to so the events thread caches it from the next poll,
+        until remote.unsubscribe_level(mode) is called.
         """
-
-        def fget(x):
-            return round(20 * log(x, 10), 1) if x > 0 else -200.0
-
-        if not self._remote.stopped() and self._remote.event.ldirty:
-            vals = self._remote.cache["strip_level"][self.range[0] : self.range[-1]]
-        else:
-            vals = [self._remote.get_level(mode, i) for i in range(*self.range)]
-
-        return tuple(fget(val) for val in vals)
+        remote = self._remote
+        if not remote.stopped() and remote.event.ldirty:
+            if (
+                remote._level_mask >> mode & 1
+                and (frame := remote.cache["levels_db"].get(mode)) is not None
+            ):
+                return frame[self.range[0] : self.range[-1]]
+            remote.subscribe_level(mode)
+        return levels.convert(
+            [self._remote.get_level(mode, i) for i in range(*self.range)]
+        )
 
     @property
     def identifier(self) -> str:
@@ -428,31 +512,44 @@ class StripLevel(IRemote):
 
     @property
     def prefader(self) -> tuple:
-        self._remote.strip_mode = 0
         return self.getter(0)
 
     @property
     def postfader(self) -> tuple:
-        self._remote.strip_mode = 1
         return self.getter(1)
 
     @property
     def postmute(self) -> tuple:
-        self._remote.strip_mode = 2
         return self.getter(2)
 
     @property
     def isdirty(self) -> bool:
         """
-        Returns dirty status for this specific channel.
+        Returns dirty status for this specific channel, in any subscribed strip level mode.
 
         Expected to be used in a callback only.
         """
         if not self._remote.stopped():
-            return any(self._remote._strip_comp[self.range[0] : self.range[-1]])
+            return bool(self._remote._level_dirty[0] & self._mask)
 
     is_updated = isdirty
 
+    def peak_hold(self, mode: int = 0) -> tuple:
+        """Returns the peak of each channel held for peak_hold frames, in dB. Requires level history"""
+        return history.stat(self._remote, "peak_hold", mode, self.range)
+
+    def rms(self, mode: int = 0) -> tuple:
+        """Returns the RMS of each channel over the history, in dB. Requires level history"""
+        return history.stat(self._remote, "rms", mode, self.range)
+
+    def average(self, mode: int = 0) -> tuple:
+        """Returns the average of each channel over the history, in dB. Requires level history"""
+        return history.stat(self._remote, "average", mode, self.range)
+
+    def clips(self, mode: int = 0) -> tuple:
+        """Returns the number of clipped frames per channel in the history. Requires level history"""
+        return history.stat(self._remote, "clips", mode, self.range)
+
 
 def make_strip_level_map(kind):
     phys_map = tuple((i, i + 2) for i in range(0, kind.phys_in * 2, 2))
@@ -469,8 +566,15 @@ def make_strip_level_map(kind):
 
 _make_strip_level_maps = {kind.name: make_strip_level_map(kind) for kind in kinds_all}
 
+strip_channel_maps = {
+    name: levels.ChannelMap(level_map)
+    for name, level_map in _make_strip_level_maps.items()
+}
+
 
 class GainLayer(IRemote):
+    __slots__ = ("_i",)
+
     def __init__(self, remote, index, i):
         super().__init__(remote, index)
         self._i = i
@@ -488,116 +592,16 @@ class GainLayer(IRemote):
         self.setter(f"GainLayer[{self._i}]", val)
 
 
-def _make_gainlayer_mixin(remote, index):
-    """Creates a GainLayer mixin"""
-    return type(
-        "GainlayerMixin",
-        (),
-        {
-            "gainlayer": tuple(
-                GainLayer(remote, index, i) for i in range(remote.kind.num_bus)
-            )
-        },
-    )
-
-
-def _make_channelout_mixin(kind):
-    """Creates a channel out property mixin"""
-    return type(
-        f"ChannelOutMixin{kind}",
-        (),
-        {
-            **{f"A{i}": bool_prop(f"A{i}") for i in range(1, kind.phys_out + 1)},
-            **{f"B{i}": bool_prop(f"B{i}") for i in range(1, kind.virt_out + 1)},
-        },
-    )
-
-
-_make_channelout_mixins = {
-    kind.name: _make_channelout_mixin(kind) for kind in kinds_all
-}
-
-
-def _make_effects_mixin(kind, is_phys):
-    """creates an effects mixin for a kind"""
-
-    def _make_xy_cls():
-        pan = {param: float_prop(param) for param in ["pan_x", "pan_y"]}
-        color = {param: float_prop(param) for param in ["color_x", "color_y"]}
-        fx = {param: float_prop(param) for param in ["fx_x", "fx_y"]}
-        if is_phys:
-            return type(
-                "XYPhys",
-                (),
-                {
-                    **pan,
-                    **color,
-                    **fx,
-                },
-            )
-        return type(
-            "XYVirt",
-            (),
-            {**pan},
-        )
-
-    def _make_fx_cls():
-        if is_phys:
-            return type(
-                "FX",
-                (),
-                {
-                    **{
-                        param: float_prop(param)
-                        for param in ["reverb", "delay", "fx1", "fx2"]
-                    },
-                    **{
-                        f"post{param}": bool_prop(f"post{param}")
-                        for param in ["reverb", "delay", "fx1", "fx2"]
-                    },
-                },
-            )
-        return type("FX", (), {})
-
-    if kind.name == "basic":
-        steps = (_make_xy_cls,)
-    elif kind.name == "banana":
-        steps = (_make_xy_cls,)
-    elif kind.name == "potato":
-        steps = (_make_xy_cls, _make_fx_cls)
-    return type(f"Effects{kind}", tuple(step() for step in steps), {})
-
-
-def _make_effects_mixins(is_phys):
-    return {kind.name: _make_effects_mixin(kind, is_phys) for kind in kinds_all}
-
-
 def strip_factory(is_phys_strip, remote, i) -> Union[PhysicalStrip, VirtualStrip]:
     """
     Factory method for strips
 
-    Mixes in required classes
+    Strip classes are generated once per kind and reused
 
     Returns a physical or virtual strip subclass
     """
-    STRIP_cls = (
-        PhysicalStrip.make(remote, i, is_phys_strip)
-        if is_phys_strip
-        else VirtualStrip.make(remote, i, is_phys_strip)
-    )
-    CHANNELOUTMIXIN_cls = _make_channelout_mixins[remote.kind.name]
-
-    _kls = (STRIP_cls, CHANNELOUTMIXIN_cls)
-    if remote.kind.name == "potato":
-        GAINLAYERMIXIN_cls = _make_gainlayer_mixin(remote, i)
-        _kls += (GAINLAYERMIXIN_cls,)
-    return type(
-        f"{STRIP_cls.__name__}{remote.kind}",
-        _kls,
-        {
-            "levels": StripLevel(remote, i),
-        },
-    )(remote, i)
+    STRIP_cls = PhysicalStrip if is_phys_strip else VirtualStrip
+    return STRIP_cls.make(remote.kind.name)(remote, i)
 
 
 def request_strip_obj(is_phys_strip, remote, i) -> Strip:
@@ -17,9 +17,9 @@ class Subject:
         return self._observers
 
     def notify(self, event):
-        """run callbacks on update"""
+        """run callbacks on update, an observer may remove itself while notified"""
 
-        for o in self._observers:
+        for o in tuple(self._observers):
             if hasattr(o, "on_update"):
                 o.on_update(event)
             else:
@@ -0,0 +1,171 @@
+import ctypes as ct
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from ctypes.wintypes import CHAR, FLOAT, LONG, WCHAR
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .simulator import PROTOTYPES, make_functions
+
+logger = logging.getLogger(__name__)
+
+INPUTS = (LONG, FLOAT, ct.POINTER(CHAR), ct.POINTER(WCHAR))
+
+
+def _value(argtype, arg, res: int):
+    """Returns a JSON serializable value for a ctypes argument, read after the call"""
+    if argtype is FLOAT and isinstance(arg, float):  # as the function receives it
+        return ct.c_float(arg).value
+    if hasattr(arg, "_obj"):  # byref()
+        arg = arg._obj
+    if isinstance(arg, ct._Pointer):
+        arg = arg.contents
+    if isinstance(arg, ct.Array) and arg._type_ is ct.c_char:
+        return arg.raw[: max(res, 0)].hex()
+    if isinstance(arg, bytes):
+        return arg.decode()
+    if isinstance(arg, (ct.Array, ct._SimpleCData)):
+        return arg.value
+    return arg
+
+
+class Tracer:
+    """
+    Records every call made through CBindings.call.
+
+    Each entry holds the function name, its arguments as read after the call,
+    the return code, the start time relative to the first entry and the duration, in seconds.
+
+    If path is given entries are also written to it as JSON lines.
+    """
+
+    def __init__(self, call, path: Optional[Union[str, Path]] = None):
+        self._call = call
+        self.entries = []
+        self._lock = threading.Lock()
+        self._start = None
+        self._file = open(path, "w") if path else None
+        self.closed = False
+        self.logger = logger.getChild(self.__class__.__name__)
+
+    def _traced(self, func):
+        """Wraps func, records each call to it"""
+
+        def traced(*args):
+            start = time.perf_counter()
+            res = func(*args)
+            dur = time.perf_counter() - start
+            entry = {
+                "fn": func.__name__,
+                "args": [
+                    _value(argtype, arg, res)
+                    for argtype, arg in zip(func.argtypes or (), args)
+                ],
+                "res": res,
+                "t": 0.0,
+                "dur": round(dur, 7),
+            }
+            with self._lock:
+                if self._start is None:
+                    self._start = start
+                entry["t"] = round(start - self._start, 7)
+                self.entries.append(entry)
+                if self._file:
+                    self._file.write(json.dumps(entry) + "\n")
+            return res
+
+        traced.__name__ = func.__name__
+        return traced
+
+    def call(self, func, *args, **kwargs):
+        if self.closed:
+            return self._call(func, *args, **kwargs)
+        return self._call(self._traced(func), *args, **kwargs)
+
+    def close(self):
+        """Stops recording, calls still made through the Tracer are passed through"""
+        self.closed = True
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def counts(self) -> Counter:
+        """Returns the number of calls made to each function"""
+        return Counter(entry["fn"] for entry in self.entries)
+
+    def total(self) -> float:
+        """Returns the time spent in calls, in seconds"""
+        return sum(entry["dur"] for entry in self.entries)
+
+
+def load(path: Union[str, Path]) -> list:
+    """Reads trace entries written by a Tracer"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Replayer:
+    """
+    Feeds recorded results back, stands in for the DLL as a backend.
+
+    Each call to a function is answered by the next entry recorded for it: outputs are
+    written back and the recorded return code returned. If delay, each call takes as long as it did when recorded.
+
+    Input arguments that differ from those recorded are logged and kept in mismatches.
+    Once the entries for a function are exhausted, calls to it return -2.
+    """
+
+    def __init__(self, entries: Union[str, Path, Iterable[dict]], delay: bool = False):
+        if isinstance(entries, (str, Path)):
+            entries = load(entries)
+        self.delay = delay
+        self.queues = defaultdict(deque)
+        for entry in entries:
+            self.queues[entry["fn"]].append(entry)
+        self.mismatches = []
+        self._lock = threading.Lock()
+        self.logger = logger.getChild(self.__class__.__name__)
+
+        for name, func in make_functions(
+            {name: self._replay(name) for name in PROTOTYPES}
+        ).items():
+            setattr(self, name, func)
+
+    def remaining(self) -> Counter:
+        """Returns the number of unreplayed entries per function"""
+        return Counter({fn: len(q) for fn, q in self.queues.items() if q})
+
+    def _replay(self, name: str):
+        argtypes = PROTOTYPES[name]
+
+        def replay(*args):
+            with self._lock:
+                try:
+                    entry = self.queues[name].popleft()
+                except IndexError:
+                    self.logger.error(f"no recorded entries left for {name}")
+                    return -2
+            if self.delay:
+                time.sleep(entry["dur"])
+            for argtype, arg, val in zip(argtypes, args, entry["args"]):
+                if argtype in INPUTS:
+                    if argtype is ct.POINTER(CHAR):
+                        arg = ct.cast(arg, ct.c_char_p).value.decode()
+                    elif argtype is ct.POINTER(WCHAR):
+                        arg = ct.cast(arg, ct.c_wchar_p).value
+                    if arg != val:
+                        self.logger.warning(f"{name}: expected {val!r}, got {arg!r}")
+                        self.mismatches.append((name, val, arg))
+                elif argtype._type_ is CHAR * 1024:
+                    data = bytes.fromhex(val)
+                    ct.memmove(arg, data, len(data))
+                elif issubclass(argtype._type_, ct.Array):
+                    arg.contents.value = val
+                else:
+                    arg[0] = val
+            return entry["res"]
+
+        return replay
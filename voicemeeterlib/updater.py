@@ -2,74 +2,157 @@ import logging
 import threading
 import time
 
-from .util import comp
+from . import levels
 
 logger = logging.getLogger(__name__)
 
 
-class Producer(threading.Thread):
-    """Continously send job queue to the Updater thread at a rate of self._remote.ratelimit."""
+class Updater(threading.Thread):
+    """
+    Checks each subscribed event type on its own deadline, from a single thread.
+
+    Work that falls behind is coalesced into one check, never queued.
+    """
 
-    def __init__(self, remote, queue, stop_event):
-        super().__init__(name="producer", daemon=False)
+    def __init__(self, remote, stop_event, clock=time.monotonic):
+        super().__init__(name="updater", daemon=False)
         self._remote = remote
-        self.queue = queue
         self.stop_event = stop_event
+        self._clock = clock
+        self.drift = {}
+        self._remote._level_dirty = (0, 0)
+        self._pending = (0, 0)
+        self._notified = None
+        self._gates = {
+            mode: levels.Threshold(dbs)
+            for mode, dbs in self._remote.level_thresholds.items()
+        }
+        self._remote.cache["levels"] = {}
+        self._remote.cache["levels_db"] = {}
+        self._update_cache(self._remote._get_levels())
         self.logger = logger.getChild(self.__class__.__name__)
 
+    def _update_cache(self, frames):
+        """Stores the raw level frame and its dB conversion for each level mode"""
+        for mode, frame in frames.items():
+            self._remote.cache["levels"][mode] = frame
+            self._remote.cache["levels_db"][mode] = frame_db = levels.convert(frame)
+            if (gate := self._gates.get(mode)) is not None and gate.reference is None:
+                gate.changed(frame_db)
+
+    def _update_levels(self, frames):
+        """
+        Compares each level frame against the cached frame, once per frame, then caches it.
+
+        Channels of a level mode with thresholds are compared in dB against the level last reported for them.
+
+        Accumulates (strip bits, bus bits) until observers are notified,
+        strip bits are the union over the subscribed strip level modes.
+        """
+        cache, cache_db = self._remote.cache["levels"], self._remote.cache["levels_db"]
+        strip_bits, bus_bits = self._pending
+        for mode, frame in frames.items():
+            frame_db = levels.convert(frame)
+            if (gate := self._gates.get(mode)) is not None:
+                bits = gate.changed(frame_db)
+            elif (cached := cache.get(mode)) is None:
+                bits = (1 << len(frame)) - 1
+            else:
+                bits = levels.changed(cached, frame)
+            cache[mode], cache_db[mode] = frame, frame_db
+            if mode == 3:
+                bus_bits |= bits
+            else:
+                strip_bits |= bits
+        self._pending = (strip_bits, bus_bits)
+
+    def _flush_dirty(self) -> bool:
+        """
+        Publishes the accumulated level dirty bitmasks, at most once per level_interval.
+
+        Returns True if there was a change to publish.
+        """
+        now = self._clock()
+        if not any(self._pending) or (
+            self._notified is not None
+            and now - self._notified < self._remote.level_interval
+        ):
+            self._remote._level_dirty = (0, 0)
+            return False
+        self._remote._level_dirty, self._pending = self._pending, (0, 0)
+        self._notified = now
+        return True
+
     def stopped(self):
         return self.stop_event.is_set()
 
-    def run(self):
-        while not self.stopped():
-            if self._remote.event.pdirty:
-                self.queue.put("pdirty")
-            if self._remote.event.mdirty:
-                self.queue.put("mdirty")
-            if self._remote.event.midi:
-                self.queue.put("midi")
-            if self._remote.event.ldirty:
-                self.queue.put("ldirty")
-            time.sleep(self._remote.ratelimit)
-        self.logger.debug(f"terminating {self.name} thread")
-        self.queue.put(None)
+    def interval(self, event) -> float:
+        """Returns the polling interval for an event type"""
+        return self._remote.event.rates[event]
 
+    def _check(self, event):
+        """
+        Notifies observers if an event type is dirty.
 
-class Updater(threading.Thread):
-    def __init__(self, remote, queue):
-        super().__init__(name="updater", daemon=True)
-        self._remote = remote
-        self.queue = queue
-        self._remote._strip_comp = [False] * (self._remote.kind.num_strip_levels)
-        self._remote._bus_comp = [False] * (self._remote.kind.num_bus_levels)
-        (
-            self._remote.cache["strip_level"],
-            self._remote.cache["bus_level"],
-        ) = self._remote._get_levels()
-        self.logger = logger.getChild(self.__class__.__name__)
+        Refresh the state mirror, if enabled, before notifying if pdirty.
+
+        Generate the level dirty bitmasks and update level cache for each subscribed level mode if ldirty.
 
-    def _update_comps(self, strip_level, bus_level):
-        self._remote._strip_comp, self._remote._bus_comp = (
-            tuple(not x for x in comp(self._remote.cache["strip_level"], strip_level)),
-            tuple(not x for x in comp(self._remote.cache["bus_level"], bus_level)),
-        )
+        Each level frame is converted to dB once, level getters slice the converted frame.
+        Level changes under their threshold are ignored, observers are notified of level changes at most once per level_interval.
+        With level history enabled every frame polled is pushed, dirty or not.
+        """
+        match event:
+            case "pdirty":
+                if (dirty := self._remote.pdirty) and self._remote.mirror:
+                    self._remote.mirror.refresh()
+            case "mdirty":
+                dirty = self._remote.mdirty
+            case "midi":
+                dirty = self._remote.get_midi_message()
+            case "ldirty":
+                if self._remote.ldirty:
+                    self._update_levels(self._remote._level_buf)
+                if self._remote.history:
+                    self._remote.history.push(self._remote._level_buf)
+                dirty = self._flush_dirty()
+        if dirty:
+            self._remote.subject.notify(event)
 
     def run(self):
         """
         Continously update observers of dirty states.
 
-        Generate _strip_comp, _bus_comp and update level cache if ldirty.
+        Each event type is checked once its deadline passes, then rescheduled by its interval.
+        If a deadline is missed by more than an interval the missed checks are dropped,
+        the lateness is recorded in self.drift.
         """
-        while event := self.queue.get():
-            if event == "pdirty" and self._remote.pdirty:
-                self._remote.subject.notify(event)
-            elif event == "mdirty" and self._remote.mdirty:
-                self._remote.subject.notify(event)
-            elif event == "midi" and self._remote.get_midi_message():
-                self._remote.subject.notify(event)
-            elif event == "ldirty" and self._remote.ldirty:
-                self._update_comps(self._remote._strip_buf, self._remote._bus_buf)
-                self._remote.cache["strip_level"] = self._remote._strip_buf
-                self._remote.cache["bus_level"] = self._remote._bus_buf
-                self._remote.subject.notify(event)
+        deadlines = {}
+        while not self.stopped():
+            events = self._remote.event.get()
+            for event in events:
+                now = self._clock()
+                deadline = deadlines.setdefault(event, now)
+                if now < deadline:
+                    continue
+                self._check(event)
+                interval = self.interval(event)
+                late = now - deadline
+                self.drift[event] = late
+                if late > interval:
+                    self.logger.debug(
+                        f"{event} check ran {round(late * 1000, 1)}ms late, coalescing missed checks"
+                    )
+                    deadlines[event] = now + interval
+                else:
+                    deadlines[event] = deadline + interval
+            for event in tuple(deadlines):
+                if event not in events:
+                    del deadlines[event]
+
+            if deadlines:
+                wait = min(deadlines.values()) - self._clock()
+            else:
+                wait = self._remote.ratelimit
+            self.stop_event.wait(max(wait, 0))
         self.logger.debug(f"terminating {self.name} thread")
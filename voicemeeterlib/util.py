@@ -1,9 +1,10 @@
 import functools
 import time
 from itertools import zip_longest
-from typing import Iterator
+from typing import Iterable, Iterator
 
 from .error import CAPIError, VMError
+from .schema import is_call
 
 
 def timeout(func):
@@ -46,20 +47,23 @@ def polling(func):
     Useful for loop getting if not running callbacks
     """
 
+    get = func.__name__ == "get"
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        get = func.__name__ == "get"
-        mb_get = func.__name__ == "get_buttonstatus"
         remote, *remaining = args
 
         if get:
             param, *rem = remaining
-        elif mb_get:
+        else:
             id, mode, *rem = remaining
             param = f"mb_{id}_{mode}"
 
         if param in remote.cache:
             return remote.cache.pop(param)
+        if get and remote.mirror:
+            if (val := remote.mirror.get(param)) is not None:
+                return val
         if remote.sync:
             remote.clear_dirty()
         return func(*args, **kwargs)
@@ -88,14 +92,30 @@ def script(func):
     return wrapper
 
 
-def comp(t0: tuple, t1: tuple) -> Iterator[bool]:
+def script_chunks(params: Iterable[tuple], limit: int = 48000) -> Iterator[str]:
     """
-    Generator function, accepts two tuples.
+    Generator function, accepts (param, value) pairs.
+
+    Yields scripts no longer than limit, split between statements.
 
-    Evaluates equality of each member in both tuples.
+    String values are quoted, unless the parameter takes an argument list (see schema.is_call).
+    Bools are written as 1 or 0. A script string can't contain a double quote, such a value raises ValueError.
     """
-    for a, b in zip(t0, t1):
-        yield a == b
+    chunk = ""
+    for param, val in params:
+        if isinstance(val, bool):
+            val = int(val)
+        elif isinstance(val, str) and not is_call(param):
+            if '"' in val:
+                raise ValueError(f"{param}: double quotes can't be sent in a script")
+            val = f'"{val}"'
+        statement = f"{param}={val};"
+        if chunk and len(chunk) + len(statement) > limit:
+            yield chunk
+            chunk = ""
+        chunk += statement
+    if chunk:
+        yield chunk
 
 
 def grouper(n, iterable, fillvalue=None):
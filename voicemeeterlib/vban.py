@@ -1,7 +1,6 @@
 from abc import abstractmethod
 
 from .iremote import IRemote
-from .kinds import kinds_all
 
 
 class VbanStream(IRemote):
@@ -11,6 +10,8 @@ class VbanStream(IRemote):
     Defines concrete implementation for vban stream
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def __str__(self):
         pass
@@ -114,6 +115,8 @@ class VbanInstream(VbanStream):
     subclasses VbanStream
     """
 
+    __slots__ = ()
+
     def __str__(self):
         return f"{type(self).__name__}{self._remote.kind}{self.index}"
 
@@ -137,14 +140,20 @@ class VbanInstream(VbanStream):
 class VbanAudioInstream(VbanInstream):
     """Represents a VBAN Audio Instream"""
 
+    __slots__ = ()
+
 
 class VbanMidiInstream(VbanInstream):
     """Represents a VBAN Midi Instream"""
 
+    __slots__ = ()
+
 
 class VbanTextInstream(VbanInstream):
     """Represents a VBAN Text Instream"""
 
+    __slots__ = ()
+
 
 class VbanOutstream(VbanStream):
     """
@@ -153,6 +162,8 @@ class VbanOutstream(VbanStream):
     Subclasses VbanStream
     """
 
+    __slots__ = ()
+
     def __str__(self):
         return f"{type(self).__name__}{self._remote.kind}{self.index}"
 
@@ -164,10 +175,14 @@ class VbanOutstream(VbanStream):
 class VbanAudioOutstream(VbanOutstream):
     """Represents a VBAN Audio Outstream"""
 
+    __slots__ = ()
+
 
 class VbanMidiOutstream(VbanOutstream):
     """Represents a VBAN Midi Outstream"""
 
+    __slots__ = ()
+
 
 def _make_stream_pair(remote, kind):
     num_instream, num_outstream, num_midi, num_text = kind.vban
@@ -193,10 +208,6 @@ def _make_stream_pair(remote, kind):
     )
 
 
-def _make_stream_pairs(remote):
-    return {kind.name: _make_stream_pair(remote, kind) for kind in kinds_all}
-
-
 class Vban:
     """
     class representing the vban module
@@ -206,7 +217,7 @@ class Vban:
 
     def __init__(self, remote):
         self.remote = remote
-        self.instream, self.outstream = _make_stream_pairs(remote)[remote.kind.name]
+        self.instream, self.outstream = _make_stream_pair(remote, remote.kind)
 
     def enable(self):
         self.remote.set("vban.Enable", 1)